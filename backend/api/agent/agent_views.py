@@ -7,6 +7,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from django.db.models import Count, Sum
 import sentry_sdk
 from ..models import ChatSession, ChatMessage, QuestionItem, EvaluatorResult, Document
 from ..agent_flow import TutorAgent
@@ -161,7 +162,7 @@ class AgentRespondView(APIView):
             
             # Get session
             try:
-                session = ChatSession.objects.get(id=session_id, user=user, is_active=True)
+                session = ChatSession.objects.select_related('user').get(id=session_id, user=user, is_active=True)
             except ChatSession.DoesNotExist:
                 return Response(
                     {"error": "Session not found or inactive"},
@@ -242,10 +243,11 @@ class AgentRespondView(APIView):
                     "followup_action": eval_result.followup_action
                 }
             
-            # Mark session as inactive if complete
+            # End the session if complete (insights and XP run in the background)
             if result.get('session_complete'):
-                session.is_active = False
-                session.save()
+                from ..views.tutoring_views import end_session_helper
+                end_result = end_session_helper(session)
+                response_data["insight_status"] = end_result["insight_status"]
             
             return Response(response_data)
             
@@ -293,9 +295,11 @@ class AgentSessionStatusView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            # Get batch
+            # Get batch progress (only the fields the status needs)
             from ..models import TutoringQuestionBatch
-            batch = TutoringQuestionBatch.objects.filter(session=session).first()
+            batch = TutoringQuestionBatch.objects.filter(session=session).values(
+                'total_questions', 'current_question_index', 'status'
+            ).first()
             
             if not batch:
                 return Response(
@@ -303,19 +307,19 @@ class AgentSessionStatusView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            # Calculate stats
-            evaluations = EvaluatorResult.objects.filter(message__session=session)
-            total_xp = sum(ev.xp for ev in evaluations)
-            questions_answered = evaluations.count()
+            # Calculate stats in a single aggregate query
+            stats = EvaluatorResult.objects.filter(message__session=session).aggregate(
+                total_xp=Sum('xp'), questions_answered=Count('id')
+            )
             
             return Response({
                 "session_id": str(session.id),
                 "language": session.language,
-                "total_questions": batch.total_questions,
-                "current_question_index": batch.current_question_index,
-                "questions_answered": questions_answered,
-                "total_xp": total_xp,
-                "is_complete": batch.status == 'completed',
+                "total_questions": batch['total_questions'],
+                "current_question_index": batch['current_question_index'],
+                "questions_answered": stats['questions_answered'],
+                "total_xp": stats['total_xp'] or 0,
+                "is_complete": batch['status'] == 'completed',
                 "is_active": session.is_active
             })
             
@@ -365,7 +369,7 @@ class AgentLanguageToggleView(APIView):
             
             # Update language
             session.language = language
-            session.save()
+            session.save(update_fields=['language', 'updated_at'])
             
             return Response({
                 "session_id": str(session.id),
@@ -163,12 +163,13 @@ class TutorAgent:
             # Build metadata filter
             metadata_filter = {"tenant_tag": {"$eq": self.tenant_tag}}
             
-            if self.session.document:
+            if self.session.document_id:
                 # Try to resolve document ID to source_doc_id
                 from .models import Document
-                doc = Document.objects.filter(id=self.session.document.id).first()
-                if doc and hasattr(doc, 's3_key') and doc.s3_key:
-                    source_doc_id = doc.s3_key.split('/')[-1]
+                # Only the S3 key is needed; skip loading the full document row
+                s3_key = Document.objects.filter(id=self.session.document_id).values_list('s3_key', flat=True).first()
+                if s3_key:
+                    source_doc_id = s3_key.split('/')[-1]
                     metadata_filter["source_doc_id"] = {"$eq": source_doc_id}
             
             # Query Pinecone for chunks
@@ -267,21 +268,8 @@ class TutorAgent:
             batch.save()
             logger.info("All questions in batch completed")
             
-            # Process session completion for XP/Batch gamification
-            try:
-                from .progress import process_session_completion
-                session_result = process_session_completion(self.session)
-                logger.info(f"Session XP processed: {session_result}")
-            except Exception as session_error:
-                # Don't let session XP processing failures break the flow
-                logger.error(f"Error processing session completion XP: {session_error}", exc_info=True)
-                sentry_sdk.capture_exception(session_error, extras={
-                    "component": "agent_flow",
-                    "method": "advance_to_next_question",
-                    "stage": "session_completion_xp",
-                    "session_id": str(self.session.id)
-                })
-            
+            # Insights and XP are applied by the finalize_session task once the
+            # view ends the session (see end_session_helper)
             return False
     
     def handle_user_message(self, user_message: str, current_question_item: QuestionItem) -> dict:
@@ -334,7 +322,6 @@ class TutorAgent:
                     }
                 else:
                     # No more questions
-                    self._generate_session_insights()
                     return {
                         "reply": "Great job! You've completed all questions. 🎉",
                         "next_question": None,
@@ -488,8 +475,7 @@ class TutorAgent:
                 "evaluation": evaluation
             }
         else:
-            # Session complete - trigger insights generation
-            self._generate_session_insights()
+            # Session complete - the view ends it and enqueues finalize_session
             return {
                 "reply": "Great job! You've completed all questions. 🎉",
                 "next_question": None,
@@ -529,7 +515,6 @@ class TutorAgent:
                 "evaluation": evaluation
             }
         else:
-            self._generate_session_insights()
             return {
                 "reply": followup_reply + "\n\nGreat job! You've completed all questions. 🎉",
                 "next_question": None,
@@ -860,10 +845,11 @@ class TutorAgent:
         logger.info(f"[CONTEXT] Built context prompt: {len(combined_prompt)} chars")
         return combined_prompt
     
-    def _generate_session_insights(self):
+    def _generate_session_insights(self, raise_errors=False):
         """
         Generate BoostMe insights after session completion.
         Calculates XP (1 per question), accuracy (% correct), and 3 zones (focus/steady/edge).
+        Errors are logged and swallowed unless raise_errors is set (task retries).
         """
         try:
             logger.info("Generating BoostMe session insights...")
@@ -916,7 +902,8 @@ class TutorAgent:
             # Call Gemini for BoostMe insights (3 zones) with user's language preference
             boostme_insights = gemini_client.generate_boostme_insights(qa_records, language=self.language)
             
-            # Create or update SessionInsight record
+            # Create or update SessionInsight record (one per session, so a
+            # retried finalization overwrites rather than duplicates)
             from .models import SessionInsight
             
             insight, created = SessionInsight.objects.update_or_create(
@@ -954,4 +941,6 @@ class TutorAgent:
                 "method": "_generate_session_insights",
                 "session_id": str(self.session.id)
             })
+            if raise_errors:
+                raise
             return None
@@ -1,8 +1,14 @@
+import functools
 import hmac
 import hashlib
 from django.conf import settings
 import sentry_sdk
 
+@functools.lru_cache(maxsize=4096)
+def _hmac_tag(secret: str, user_id: str) -> str:
+    """HMAC-SHA256 of the user ID (memoized; keyed on the secret so rotation is safe)"""
+    return hmac.new(secret.encode('utf-8'), user_id.encode('utf-8'), hashlib.sha256).hexdigest()
+
 def get_tenant_tag(user_id: str) -> str:
     """
     Generates a secure HMAC tag for a given user ID.
@@ -17,7 +23,7 @@ def get_tenant_tag(user_id: str) -> str:
             )
             raise ValueError("HMAC_SECRET is not set in the environment.")
         
-        return hmac.new(secret.encode('utf-8'), user_id.encode('utf-8'), hashlib.sha256).hexdigest()
+        return _hmac_tag(secret, user_id)
     except Exception as e:
         sentry_sdk.capture_exception(e, extras={
             "component": "auth",
@@ -0,0 +1,235 @@
+"""
+Embedding caches for the RAG pipeline.
+
+- A persistent exact-match cache of embeddings keyed by the SHA-256 of the
+  text (needs the optional `diskcache` package); enabled by setting
+  EMBEDDING_CACHE_DIR. Re-embedding the same strings (test runs, re-ingesting
+  a document) then skips the embedding API entirely.
+- An in-process semantic cache of query_rag answers, looked up by cosine
+  similarity of the query embedding; enabled by setting
+  RAG_SEMANTIC_CACHE_THRESHOLD. Entries are partitioned per tenant so answers
+  never cross users, and each tenant has a version (kept in the Django cache)
+  that ingestion and deletion bump so answers never outlive the documents they
+  came from. Uses an HNSW index when the optional `hnswlib` package is
+  installed, otherwise a brute-force NumPy scan.
+"""
+import hashlib
+import logging
+import threading
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Try to import diskcache for the persistent embedding cache
+try:
+    import diskcache
+    HAS_DISKCACHE = True
+except ImportError:
+    HAS_DISKCACHE = False
+
+# Try to import hnswlib for approximate nearest-neighbour semantic lookups
+try:
+    import hnswlib
+    HAS_HNSWLIB = True
+except ImportError:
+    HAS_HNSWLIB = False
+
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+_semantic_cache = None
+_semantic_cache_lock = threading.Lock()
+
+
+def _get_disk_cache():
+    """Return the shared diskcache.Cache, or None when the cache is disabled"""
+    global _disk_cache
+    cache_dir = getattr(settings, 'EMBEDDING_CACHE_DIR', None)
+    if not cache_dir:
+        return None
+    if not HAS_DISKCACHE:
+        logger.warning("EMBEDDING_CACHE_DIR is set but diskcache is not available - install with: pip install diskcache")
+        return None
+    if _disk_cache is None:
+        with _disk_cache_lock:
+            if _disk_cache is None:
+                _disk_cache = diskcache.Cache(cache_dir)
+    return _disk_cache
+
+
+def _cache_key(text: str) -> str:
+    # Vectors of different dimensionality must never be mixed up
+    dim = getattr(settings, 'EMBEDDING_DIM', 1536)
+    return f"emb:{dim}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+
+def get_or_compute(texts: list[str], compute) -> list[list[float]]:
+    """
+    Return embeddings for texts, calling `compute` only for uncached ones.
+
+    `compute` receives the list of distinct missing texts and must return their
+    embeddings in the same order. Without a configured cache this is simply
+    `compute(texts)`.
+    """
+    cache = _get_disk_cache()
+    if cache is None or not texts:
+        return compute(texts)
+
+    embeddings = [cache.get(_cache_key(text)) for text in texts]
+    misses = list(dict.fromkeys(text for text, emb in zip(texts, embeddings) if emb is None))
+    if misses:
+        computed = dict(zip(misses, compute(misses)))
+        for text, emb in computed.items():
+            cache.set(_cache_key(text), emb)
+        embeddings = [computed[text] if emb is None else emb for text, emb in zip(texts, embeddings)]
+    logger.info(f"Embedding cache: {len(texts) - len(misses)}/{len(texts)} texts served from cache")
+    return embeddings
+
+
+class SemanticCache:
+    """
+    In-process answer cache keyed by query embedding.
+
+    A lookup hits when the best cosine similarity reaches `threshold`. Each
+    partition key (e.g. tenant + language) keeps at most `max_entries`, the
+    oldest being replaced first. With hnswlib each partition is an HNSW index
+    (O(log n) lookups); otherwise vectors are normalized once at insert and a
+    lookup is a single matrix-vector product.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 1024, use_hnsw: bool | None = None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.use_hnsw = HAS_HNSWLIB if use_hnsw is None else use_hnsw
+        self._lock = threading.Lock()
+        self._vectors = {}    # key -> (n, dim) float32 matrix of unit vectors, or an hnswlib.Index
+        self._responses = {}  # key -> list of cached answers (slot/label order)
+        self._inserted = {}   # key -> total number of answers added (HNSW slot rotation)
+        self._versions = {}   # key -> tenant document version the answers were built from
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _drop_if_stale(self, key: str, version: int):
+        # Caller holds the lock. Answers from an older document version are
+        # discarded as a whole partition.
+        if key in self._versions and self._versions[key] != version:
+            self._vectors.pop(key, None)
+            self._responses.pop(key, None)
+            self._inserted.pop(key, None)
+            del self._versions[key]
+
+    def lookup(self, key: str, vector, version: int = 0):
+        """Return the cached answer for the most similar query, or None"""
+        if self.use_hnsw:
+            with self._lock:
+                self._drop_if_stale(key, version)
+                index = self._vectors.get(key)
+                if index is None:
+                    return None
+                labels, distances = index.knn_query(self._normalize(vector), k=1)
+                # hnswlib's cosine distance is 1 - cosine similarity
+                if 1.0 - distances[0][0] >= self.threshold:
+                    return self._responses[key][int(labels[0][0])]
+                return None
+
+        with self._lock:
+            self._drop_if_stale(key, version)
+            matrix = self._vectors.get(key)
+            responses = self._responses.get(key)
+        if matrix is None:
+            return None
+        sims = matrix @ self._normalize(vector)
+        best = int(sims.argmax())
+        return responses[best] if sims[best] >= self.threshold else None
+
+    def add(self, key: str, vector, response: str, version: int = 0):
+        """Cache an answer, evicting the oldest entries beyond max_entries"""
+        row = self._normalize(vector)[None, :]
+        with self._lock:
+            self._drop_if_stale(key, version)
+            self._versions[key] = version
+            if self.use_hnsw:
+                self._add_hnsw(key, row, response)
+                return
+            matrix = self._vectors.get(key)
+            if matrix is None:
+                self._vectors[key] = row
+                self._responses[key] = [response]
+            else:
+                # New objects are swapped in so concurrent lookups see a
+                # consistent (matrix, responses) snapshot
+                self._vectors[key] = np.vstack([matrix, row])[-self.max_entries:]
+                self._responses[key] = (self._responses[key] + [response])[-self.max_entries:]
+
+    def _add_hnsw(self, key: str, row: np.ndarray, response: str):
+        # Labels are ring-buffer slots; re-adding a label overwrites that entry
+        index = self._vectors.get(key)
+        if index is None:
+            index = hnswlib.Index(space='cosine', dim=row.shape[1])
+            index.init_index(max_elements=self.max_entries, ef_construction=200, M=16)
+            index.set_ef(50)
+            self._vectors[key] = index
+            self._responses[key] = []
+            self._inserted[key] = 0
+        label = self._inserted[key] % self.max_entries
+        index.add_items(row, [label])
+        responses = self._responses[key]
+        if label < len(responses):
+            responses[label] = response
+        else:
+            responses.append(response)
+        self._inserted[key] += 1
+
+    def clear(self):
+        with self._lock:
+            self._vectors.clear()
+            self._responses.clear()
+            self._inserted.clear()
+            self._versions.clear()
+
+
+def _tenant_version_key(tenant_tag: str) -> str:
+    return f"semcache:version:{tenant_tag}"
+
+
+def get_tenant_cache_version(tenant_tag: str) -> int:
+    """Current document version of a tenant (0 until the first bump)"""
+    return cache.get(_tenant_version_key(tenant_tag), 0)
+
+
+def bump_tenant_cache_version(tenant_tag: str):
+    """
+    Invalidate a tenant's semantic-cache answers after its documents change.
+
+    The version lives in the Django cache so web and Celery processes agree
+    on it; deployments with several processes need a shared backend
+    (CACHE_REDIS_URL).
+    """
+    if getattr(settings, 'RAG_SEMANTIC_CACHE_THRESHOLD', None) is None:
+        return
+    key = _tenant_version_key(tenant_tag)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def get_semantic_cache():
+    """Return the shared SemanticCache, or None when it is disabled"""
+    global _semantic_cache
+    threshold = getattr(settings, 'RAG_SEMANTIC_CACHE_THRESHOLD', None)
+    if threshold is None:
+        return None
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                _semantic_cache = SemanticCache(threshold=threshold)
+    return _semantic_cache
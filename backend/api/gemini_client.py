@@ -1,12 +1,14 @@
 from django.conf import settings
 import logging
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
 import random
 import concurrent.futures
 import threading
 from .llm_key_manager import LLMKeyManager
+from . import embedding_cache
 import sentry_sdk
 
 logger = logging.getLogger(__name__)
@@ -19,6 +21,16 @@ except ImportError:
     HAS_TIKTOKEN = False
     logger.warning("tiktoken not available - install with: pip install tiktoken")
 
+# Try to import orjson for faster parsing of model JSON responses; its
+# JSONDecodeError subclasses json.JSONDecodeError so existing handlers still apply
+try:
+    import orjson
+    HAS_ORJSON = True
+    _json_loads = orjson.loads
+except ImportError:
+    HAS_ORJSON = False
+    _json_loads = json.loads
+
 class GeminiLLMClient:
     """
     Client for Google's Gemini API using direct HTTP requests
@@ -28,8 +40,22 @@ class GeminiLLMClient:
         self.api_key = None
         # Key manager supports multiple comma-separated keys in settings.LLM_API_KEY
         self.key_manager = LLMKeyManager(settings.LLM_API_KEY if getattr(settings, 'LLM_API_KEY', None) else None)
+        # Shared HTTP session (created lazily) so repeated calls reuse TCP+TLS connections
+        self._http_session = None
+        self._http_session_lock = threading.Lock()
         self._initialize_client()
     
+    def _get_http_session(self) -> requests.Session:
+        """Return the shared HTTP session, creating it on first use"""
+        if self._http_session is None:
+            with self._http_session_lock:
+                if self._http_session is None:
+                    pool_size = max(10, getattr(settings, 'EMBEDDING_CONCURRENCY', 5))
+                    session = requests.Session()
+                    session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=pool_size))
+                    self._http_session = session
+        return self._http_session
+    
     def _initialize_client(self):
         """Initialize Gemini client with API key from settings"""
         try:
@@ -105,7 +131,7 @@ class GeminiLLMClient:
                     try:
                         # Allow per-call timeout that grows slightly on retries to handle slow model responses
                         current_timeout = min(request_timeout * (2 ** attempt), 120)
-                        response = requests.post(url, headers=headers, json=data, params=params, timeout=current_timeout)
+                        response = self._get_http_session().post(url, headers=headers, json=data, params=params, timeout=current_timeout)
                         response.raise_for_status()
 
                         result = response.json()
@@ -314,8 +340,9 @@ class GeminiLLMClient:
             
             logger.info(f"Generating embeddings for {len(texts)} text chunks...")
             
-            # Use direct HTTP requests for embeddings
-            embeddings = self._get_embeddings_with_requests(texts)
+            # Use direct HTTP requests for embeddings (cached texts are skipped
+            # when the embedding cache is enabled)
+            embeddings = embedding_cache.get_or_compute(texts, self._get_embeddings_with_requests)
             logger.info(f"✅ Embeddings generated using HTTP requests")
             
             # Validate embedding dimensions
@@ -350,7 +377,7 @@ class GeminiLLMClient:
         logger.info(f"Starting parallel embedding for {len(texts)} texts with {max_workers} workers")
         start_time = time.time()
 
-        session = requests.Session()
+        session = self._get_http_session()
 
         def embed_single_text(idx_text_pair):
             """Worker function to embed a single text with retry logic"""
@@ -424,25 +451,18 @@ class GeminiLLMClient:
         embeddings = [None] * len(texts)
         failed_indices = []
 
-        try:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_idx = {executor.submit(embed_single_text, (idx, text)): idx for idx, text in enumerate(texts)}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_idx = {executor.submit(embed_single_text, (idx, text)): idx for idx, text in enumerate(texts)}
 
-                for future in concurrent.futures.as_completed(future_to_idx):
-                    idx = future_to_idx[future]
-                    try:
-                        i, embedding, attempts = future.result()
-                        embeddings[i] = embedding
-                        logger.debug(f"Collected embedding {i} (took {attempts} attempts)")
-                    except Exception as e:
-                        failed_indices.append(idx)
-                        logger.error(f"Failed to get embedding for text {idx}: {e}")
-
-        finally:
-            try:
-                session.close()
-            except Exception:
-                pass
+            for future in concurrent.futures.as_completed(future_to_idx):
+                idx = future_to_idx[future]
+                try:
+                    i, embedding, attempts = future.result()
+                    embeddings[i] = embedding
+                    logger.debug(f"Collected embedding {i} (took {attempts} attempts)")
+                except Exception as e:
+                    failed_indices.append(idx)
+                    logger.error(f"Failed to get embedding for text {idx}: {e}")
 
         # Check for failures
         if failed_indices:
@@ -479,7 +499,8 @@ class GeminiLLMClient:
         if HAS_TIKTOKEN:
             try:
                 enc = tiktoken.get_encoding("cl100k_base")
-                token_lists = [enc.encode(t) for t in texts]
+                # encode_batch fans the texts out over tiktoken's thread pool
+                token_lists = enc.encode_batch(texts) if len(texts) > 1 else [enc.encode(texts[0])]
                 logger.info(f"✅ tiktoken tokenization successful for {len(texts)} texts (fast local)")
                 return token_lists
             except Exception as e:
@@ -507,7 +528,23 @@ class GeminiLLMClient:
         """
         token_list = self.tokenize_texts([text])[0]
         return len(token_list)
-    
+
+    def count_tokens_batch(self, texts: list[str]) -> list[int]:
+        """
+        Count tokens for many texts in a single tokenizer pass.
+
+        Args:
+            texts: List of text strings to count tokens for
+
+        Returns:
+            Number of tokens for each text, in input order
+        """
+        if not texts:
+            return []
+
+        # tokenize_texts already falls back to whitespace splitting on failure
+        return [len(tokens) for tokens in self.tokenize_texts(texts)]
+
     # ============================================================
     # NEW METHODS FOR TANGLISH AGENT FLOW
     # ============================================================
@@ -602,7 +639,7 @@ Handle {language} or English input.
                 cleaned = cleaned.strip()
                 
                 # Parse JSON
-                result = json.loads(cleaned)
+                result = _json_loads(cleaned)
                 
                 print(f"[CLASSIFIER] Parsed JSON: {result}")
                 
@@ -740,7 +777,7 @@ Handle {language} or English input.
                         cleaned = cleaned[:-3]
                     cleaned = cleaned.strip()
                     
-                    questions = json.loads(cleaned)
+                    questions = _json_loads(cleaned)
 
                     if not isinstance(questions, list):
                         raise ValueError("Response is not a JSON array")
@@ -761,7 +798,7 @@ Handle {language} or English input.
                         # If element is a string, try to parse it as JSON
                         if isinstance(q, str):
                             try:
-                                parsed = json.loads(q)
+                                parsed = _json_loads(q)
                                 if isinstance(parsed, dict):
                                     normalized.append(parsed)
                                     continue
@@ -873,7 +910,7 @@ Handle {language} or English input.
                     cleaned = cleaned[:-3]
                 cleaned = cleaned.strip()
                 
-                evaluation = json.loads(cleaned)
+                evaluation = _json_loads(cleaned)
                 
                 # Validate required keys
                 required_keys = ['score', 'correct', 'explanation', 'confidence', 'followup_action']
@@ -969,7 +1006,7 @@ Handle {language} or English input.
                     cleaned = cleaned[:-3]
                 cleaned = cleaned.strip()
                 
-                insights = json.loads(cleaned)
+                insights = _json_loads(cleaned)
                 
                 # Validate required keys
                 required_keys = ['strength', 'weakness', 'opportunity', 'threat']
@@ -1123,7 +1160,7 @@ Generate BoostMe insights in JSON:"""
                     cleaned = cleaned[:-3]
                 cleaned = cleaned.strip()
                 
-                insights = json.loads(cleaned)
+                insights = _json_loads(cleaned)
                 
                 # Validate structure - now expecting reasons arrays too
                 required_keys = ['focus_zone', 'steady_zone', 'edge_zone']
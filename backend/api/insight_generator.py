@@ -1,7 +1,7 @@
 """Insight generation helper.
 
 This module provides a small compatibility layer so views and tests can call
-`generate_insights_for_session(session_id)`. It delegates to the TutorAgent
+`generate_insights_for_session(session_or_id)`. It delegates to the TutorAgent
 implementation to avoid duplicating logic.
 """
 import sentry_sdk
@@ -14,28 +14,39 @@ class InsightGenerator:
     The real logic lives in `agent_flow.TutorAgent._generate_session_insights`.
     """
 
-    def generate_session_insights(self, session):
+    def generate_session_insights(self, session, raise_errors=False):
         from .agent_flow import TutorAgent
 
         agent = TutorAgent(session)
-        return agent._generate_session_insights()
+        return agent._generate_session_insights(raise_errors=raise_errors)
 
 
-def generate_insights_for_session(session_id: str):
+def generate_insights_for_session(session_or_id, raise_errors=False):
     """Convenience function used by views and tests.
 
-    Returns a SessionInsight instance on success or None on failure.
+    Accepts a ChatSession (ideally loaded with select_related('user',
+    'document')) or a session id, in which case the session is fetched with
+    its user and document joined in.
+
+    Returns a SessionInsight instance on success or None on failure. With
+    raise_errors=True failures propagate instead (used by Celery tasks so
+    transient errors are retried).
     """
-    try:
-        session = ChatSession.objects.get(id=session_id)
-    except ChatSession.DoesNotExist:
-        return None
+    if isinstance(session_or_id, ChatSession):
+        session = session_or_id
+    else:
+        try:
+            session = ChatSession.objects.select_related('user', 'document').get(id=session_or_id)
+        except ChatSession.DoesNotExist:
+            return None
 
     try:
         generator = InsightGenerator()
-        insight = generator.generate_session_insights(session)
+        insight = generator.generate_session_insights(session, raise_errors=raise_errors)
         return insight
     except Exception as e:
+        if raise_errors:
+            raise
         # Log to Sentry but fail gracefully for the calling views
         try:
             sentry_sdk.capture_exception(e)
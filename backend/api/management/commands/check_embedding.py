@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from api.gemini_client import gemini_client
+import time
+
+
+class Command(BaseCommand):
+    help = 'Check that the Gemini embedding API is reachable and returns vectors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--text', type=str, default='Hello world', help='Text to embed')
+        parser.add_argument('--repeat', type=int, default=1, help='Number of calls (later calls reuse the warm HTTP connection)')
+
+    def handle(self, *args, **options):
+        text = options['text']
+        repeat = max(1, options['repeat'])
+
+        for attempt in range(1, repeat + 1):
+            try:
+                start_time = time.time()
+                embeddings = gemini_client.get_embeddings([text])
+                elapsed = time.time() - start_time
+            except Exception as e:
+                raise CommandError(f'Embedding failed: {e}') from e
+
+            if not embeddings or not embeddings[0]:
+                raise CommandError('No embeddings returned')
+
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ Call {attempt}: {len(embeddings[0])}D vector in {elapsed:.3f}s'
+            ))
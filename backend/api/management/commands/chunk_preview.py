@@ -1,5 +1,25 @@
+import io
+from collections import deque
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from api.rag_ingestion import read_document_pages, token_chunk_pages_to_chunks
+
+# Collapse line breaks/tabs in previews with a single translate() pass
+_WS_TAB = str.maketrans({'\n': ' ', '\r': ' ', '\t': ' '})
+
+# Token counts memoized by chunk text; repeated boilerplate pages (headers,
+# footers) produce identical chunks that only need counting once
+_token_counts: dict[str, int] = {}
+
+
+def count_chunk_tokens(texts: list[str]) -> tuple[list[int], int]:
+    """Return token counts for texts and how many were served from the memo."""
+    from api.gemini_client import gemini_client
+
+    misses = list(dict.fromkeys(t for t in texts if t not in _token_counts))
+    if misses:
+        _token_counts.update(zip(misses, gemini_client.count_tokens_batch(misses)))
+    return [_token_counts[t] for t in texts], len(texts) - len(misses)
 
 
 class Command(BaseCommand):
@@ -9,18 +29,90 @@ class Command(BaseCommand):
         parser.add_argument('--file', type=str, required=True, help='Path to local document (pdf/docx/txt)')
         parser.add_argument('--target', type=int, default=None, help='Target tokens per chunk (overrides settings)')
         parser.add_argument('--overlap', type=int, default=None, help='Overlap tokens per chunk (overrides settings)')
+        parser.add_argument('--legacy', action='store_true', help='Preview the legacy character-based chunker')
 
     def handle(self, *args, **options):
+        # Heavy imports (pinecone, spaCy, numpy) are deferred so --help and
+        # argument errors stay fast
+        import numpy as np
+        from api.rag_ingestion import (
+            HAS_SPACY,
+            chunk_pages_to_chunks,
+            read_document_pages_iter,
+            token_chunk_pages_to_chunks_iter,
+        )
+
         file_path = options['file']
         target = options['target']
         overlap = options['overlap']
 
-        pages = read_document_pages(file_path)
-        if not pages:
+        # Stream pages so only the current page (plus the last few for the
+        # preview header) is held in memory
+        recent_pages = deque(maxlen=3)
+        page_count = 0
+
+        def pages_iter():
+            nonlocal page_count
+            for page_count, page in enumerate(read_document_pages_iter(file_path), start=1):
+                recent_pages.append((page_count, page))
+                yield page
+
+        use_legacy = options['legacy'] or getattr(settings, 'RAG_USE_LEGACY_CHUNKER', False) or not HAS_SPACY
+        if use_legacy:
+            chunks_with_pages = chunk_pages_to_chunks(list(pages_iter()), chunk_size=1000, overlap=100)
+        else:
+            # Token chunker yields (text, page, token_count) so no re-tokenization is needed
+            chunks_with_pages = list(token_chunk_pages_to_chunks_iter(
+                pages_iter(), target_tokens=target, overlap_tokens=overlap
+            ))
+        if not page_count:
             self.stdout.write(self.style.ERROR('No pages extracted from file.'))
             return
 
-        chunks_with_pages = token_chunk_pages_to_chunks(pages, target_tokens=target, overlap_tokens=overlap)
+        self.stdout.write(f'Read {page_count} pages')
+        for page_num, page in recent_pages:
+            self.stdout.write(f'Page {page_num}: {len(page)} chars | {page[:120].translate(_WS_TAB)}...')
         self.stdout.write(self.style.SUCCESS(f'Created {len(chunks_with_pages)} chunks'))
-        for i, (chunk, page) in enumerate(chunks_with_pages[:20], start=1):
-            self.stdout.write(f'Chunk {i} (page {page}): {len(chunk.split())} words | preview: {chunk[:200]!s}...')
+
+        texts = [chunk[0] for chunk in chunks_with_pages]
+        if use_legacy:
+            # Legacy chunks carry no token counts; count unseen ones in one batch
+            counts, cache_hits = count_chunk_tokens(texts)
+        else:
+            counts, cache_hits = [chunk[2] for chunk in chunks_with_pages], None
+        chunk_stats = [
+            {'page': chunk[1], 'tokens': tokens, 'chars': len(chunk[0]), 'text': chunk[0]}
+            for chunk, tokens in zip(chunks_with_pages, counts)
+        ]
+
+        # Format every preview line into one buffer and write it once
+        buf = io.StringIO()
+        for i, stat in enumerate(chunk_stats[:20], start=1):
+            text = stat['text']
+            preview = (text[:150] + '...') if len(text) > 150 else text
+            buf.write(
+                f"Chunk {i} (page {stat['page']}): {stat['tokens']} tokens, {stat['chars']} chars"
+                f" | preview: {preview.translate(_WS_TAB)}\n"
+            )
+        if buf.tell():
+            self.stdout.write(buf.getvalue(), ending='')
+
+        if chunk_stats:
+            tokens = np.fromiter((s['tokens'] for s in chunk_stats), dtype=np.int32, count=len(chunk_stats))
+            chars = np.fromiter((s['chars'] for s in chunk_stats), dtype=np.int32, count=len(chunk_stats))
+            target_tokens = target or getattr(settings, 'RAG_TOKEN_CHUNK_SIZE', 400)
+            oversized_idx = np.flatnonzero(tokens > target_tokens * 1.1)
+
+            self.stdout.write(
+                f'Tokens per chunk: min {tokens.min()}, max {tokens.max()}, avg {int(tokens.mean())}'
+            )
+            self.stdout.write(
+                f'Chars per chunk: min {chars.min()}, max {chars.max()}, avg {int(chars.mean())}'
+            )
+            if len(oversized_idx):
+                self.stdout.write(self.style.WARNING(
+                    f'{len(oversized_idx)} chunks exceed {target_tokens} tokens by >10%: '
+                    f'{(oversized_idx[:10] + 1).tolist()}'
+                ))
+            if cache_hits is not None:
+                self.stdout.write(f'Token count cache: {cache_hits}/{len(texts)} hits')
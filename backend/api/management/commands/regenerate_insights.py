@@ -0,0 +1,71 @@
+"""
+Django management command to regenerate BoostMe insights for existing sessions.
+Usage: python manage.py regenerate_insights [--sync] [--chunk-size 500]
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from api.models import SessionInsight
+
+
+class Command(BaseCommand):
+    help = 'Regenerate BoostMe insights for all sessions that have evaluated answers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Regenerate inline instead of enqueueing regenerate_session_insights tasks'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Rows fetched per database round-trip (default: 500)'
+        )
+
+    def handle(self, *args, **options):
+        sync = options['sync']
+        chunk_size = options['chunk_size']
+
+        # One query with the evaluation count annotated per row; iterator()
+        # streams rows in chunks instead of caching the whole table in memory
+        insights = (
+            SessionInsight.objects
+            .select_related('session', 'session__document')
+            .annotate(result_count=Count('session__messages__evaluation'))
+            .iterator(chunk_size=chunk_size)
+        )
+
+        if sync:
+            from api.insight_generator import InsightGenerator
+            generator = InsightGenerator()
+        else:
+            from api.tasks import regenerate_session_insights
+
+        queued = skipped = failed = 0
+        for insight in insights:
+            session = insight.session
+            title = session.title or str(session.id)
+
+            if insight.result_count == 0:
+                skipped += 1
+                self.stdout.write(f"⏭️  Skipping {title}: no evaluated answers")
+                continue
+
+            if sync:
+                if generator.generate_session_insights(session) is None:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f"❌ Failed: {title}"))
+                    continue
+                self.stdout.write(f"✅ Regenerated: {title}")
+            else:
+                # Insight only: XP was applied when the session was finalized
+                regenerate_session_insights.delay(str(session.id))
+                self.stdout.write(f"📨 Enqueued: {title}")
+            queued += 1
+
+        verb = 'Regenerated' if sync else 'Enqueued'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {queued} sessions ({skipped} skipped, {failed} failed)"
+        ))
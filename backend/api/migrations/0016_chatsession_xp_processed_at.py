@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2025-10-28 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_sessioninsight_edge_zone_reasons_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatsession',
+            name='xp_processed_at',
+            field=models.DateTimeField(blank=True, help_text='When session XP was applied to the user (guards against double XP on retries)', null=True),
+        ),
+    ]
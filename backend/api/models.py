@@ -111,6 +111,7 @@ class ChatSession(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
     language = models.CharField(max_length=16, default="tanglish", help_text="Language preference: tanglish or english")
+    xp_processed_at = models.DateTimeField(null=True, blank=True, help_text="When session XP was applied to the user (guards against double XP on retries)")
     
     class Meta:
         ordering = ['-updated_at']
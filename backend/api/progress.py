@@ -11,6 +11,7 @@ Key Principles:
 - Streak counts one test per day; missing a day resets the streak
 - Earned milestone badges persist even after streak resets
 - All updates use atomic transactions and idempotence checks
+  (EvaluatorResult.progress_processed for streaks, ChatSession.xp_processed_at for XP)
 
 Implementation:
 - update_on_test_completion(): Called per question evaluation, updates STREAK only
@@ -237,7 +238,7 @@ def process_session_completion(session):
         Exception: On database errors (should be caught by caller)
     """
     
-    from .models import EvaluatorResult, User, TutoringQuestionBatch, SessionInsight
+    from .models import EvaluatorResult, User, TutoringQuestionBatch, SessionInsight, ChatSession
     
     try:
         with transaction.atomic():
@@ -271,6 +272,26 @@ def process_session_completion(session):
             session_avg_xp = session_total_xp / session_question_count
 
             logger.info(f"Session {session.id}: {session_question_count} questions, total={session_total_xp}, avg={session_avg_xp:.2f}")
+
+            # Claim the session for XP processing. The conditional UPDATE matches
+            # at most once, so retried tasks and duplicate end-session calls
+            # cannot grant XP twice. It is rolled back with the transaction if
+            # anything below fails, leaving the session claimable for a retry.
+            processed_at = timezone.now()
+            claimed = ChatSession.objects.filter(
+                pk=session.pk, xp_processed_at__isnull=True
+            ).update(xp_processed_at=processed_at)
+
+            if claimed != 1:
+                logger.info(f"Session {session.id} already processed for XP, skipping")
+                return {
+                    'session_avg_xp': session_avg_xp,
+                    'session_question_count': session_question_count,
+                    'new_total_xp': user.total_xp_sum,
+                    'sessions_completed': SessionInsight.objects.filter(user=user, status='completed').count(),
+                    'stars_earned': 0,
+                    'batch_upgraded': None,
+                }
             
             # OLD SEMANTICS (before this change):
             # - total_xp_sum = cumulative sum of all individual question XP
@@ -302,8 +323,8 @@ def process_session_completion(session):
                     # Already processed - no-op
                     logger.info(f"Session {session.id} already processed for XP (batch.session_xp_avg={batch.session_xp_avg})")
             else:
-                # No batch record: still process using evaluator results and mark via session (non-persistent)
-                # This allows processing regardless of batch existence/completion
+                # No batch record: still process using evaluator results; the
+                # xp_processed_at claim above keeps this path idempotent too
                 session_xp_int = int(round(session_avg_xp))
                 user.total_xp_sum += session_xp_int
 
@@ -312,7 +333,7 @@ def process_session_completion(session):
             # NOTE: We DO NOT recompute from SessionInsight here because:
             # 1. SessionInsight is generated asynchronously (often after this function runs)
             # 2. Recomputing would overwrite the XP we just added above
-            # 3. The batch.xp_processed flag already ensures idempotence
+            # 3. The xp_processed_at claim (and batch.xp_processed) already ensure idempotence
             # 4. total_xp_sum is the source of truth, SessionInsight.xp_points is derived from it
 
             # Calculate ACTUAL total XP by summing all completed SessionInsights for star calculation
@@ -338,6 +359,10 @@ def process_session_completion(session):
             # Compute sessions completed for return
             sessions_completed = SessionInsight.objects.filter(user=user, status='completed').count()
 
+            # Keep the caller's instance in step with the claimed row so a
+            # later full save() of this session cannot write NULL back
+            session.xp_processed_at = processed_at
+
             return {
                 'session_avg_xp': session_avg_xp,
                 'session_question_count': session_question_count,
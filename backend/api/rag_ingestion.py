@@ -1,3 +1,4 @@
+import hashlib
 import os
 import uuid
 from pinecone import Pinecone, ServerlessSpec
@@ -5,12 +6,15 @@ from django.conf import settings
 from .auth import get_tenant_tag
 from .s3_storage import s3_storage
 from .gemini_client import gemini_client
+from .embedding_cache import bump_tenant_cache_version
 import docx
 from pypdf import PdfReader
 import tempfile
 import sentry_sdk
 import unicodedata
 import json
+import threading
+import multiprocessing
 
 # Try to import pdfplumber as a fallback for better PDF text extraction
 try:
@@ -32,10 +36,11 @@ except ImportError:
     print("Note: Also requires poppler-utils and tesseract-ocr system packages")
 
 # Try to import spaCy for sentence segmentation
+_spacy_nlp = None  # Lazy-loaded spaCy model, shared by every chunking call
+_spacy_nlp_lock = threading.Lock()
 try:
     import spacy
     HAS_SPACY = True
-    _spacy_nlp = None  # Lazy-loaded spaCy model
 except ImportError:
     HAS_SPACY = False
     print("spaCy not available - install with: pip install spacy && python -m spacy download en_core_web_sm")
@@ -85,9 +90,10 @@ def read_pdf(file_path: str) -> str:
         text += page.extract_text() or ""
     return text
 
-def read_pdf_pages_hybrid(file_path: str) -> list[str]:
+def iter_pdf_pages_hybrid(file_path: str):
     """
-    Robust PDF text extraction with OCR fallback for scanned pages.
+    Robust PDF text extraction with OCR fallback for scanned pages, yielding
+    one page at a time so only the current page's text is held in memory.
     
     Strategy:
     1. Try multiple pypdf extraction modes
@@ -98,12 +104,11 @@ def read_pdf_pages_hybrid(file_path: str) -> list[str]:
     Args:
         file_path: Path to PDF file
         
-    Returns:
-        List of page texts (one string per page)
+    Yields:
+        Page texts in page order (one string per page)
     """
     try:
         reader = PdfReader(file_path)
-        pages = []
         total_chars = 0
         ocr_pages_count = 0
         
@@ -202,11 +207,11 @@ def read_pdf_pages_hybrid(file_path: str) -> list[str]:
                 print(f"Page {page_number}: {len(page_text)} chars extracted using {extraction_method}" + 
                       (" (OCR)" if used_ocr else ""))
             
-            pages.append(page_text)
             total_chars += len(page_text)
+            yield page_text
         
         print(f"✅ Hybrid PDF extraction complete:")
-        print(f"   - {len(pages)} pages processed")
+        print(f"   - {len(reader.pages)} pages processed")
         print(f"   - {total_chars} total characters")
         print(f"   - {ocr_pages_count} pages used OCR fallback")
         
@@ -215,11 +220,24 @@ def read_pdf_pages_hybrid(file_path: str) -> list[str]:
             print(f"⚠️  WARNING: Very little text extracted ({total_chars} chars)")
             print("   This may be a heavily scanned PDF or have extraction issues")
         
-        return pages
-        
     except Exception as e:
         print(f"❌ Critical error in PDF extraction: {e}")
-        return []
+        raise
+
+def read_pdf_pages_hybrid(file_path: str) -> list[str]:
+    """
+    List form of iter_pdf_pages_hybrid().
+    
+    Args:
+        file_path: Path to PDF file
+        
+    Returns:
+        List of page texts (one string per page), or [] if the PDF cannot be read
+    """
+    try:
+        return list(iter_pdf_pages_hybrid(file_path))
+    except Exception:
+        return []  # Already reported by iter_pdf_pages_hybrid
 
 def read_pdf_pages(file_path: str) -> list[str]:
     """
@@ -354,6 +372,21 @@ def read_document_pages(file_path: str) -> list[str]:
     else:
         raise ValueError(f"Unsupported file type: {extension}")
 
+def read_document_pages_iter(file_path: str):
+    """
+    Streaming variant of read_document_pages() that yields one page at a time.
+
+    PDF pages come lazily from iter_pdf_pages_hybrid(), so the pdfplumber and
+    OCR fallbacks apply here too whenever those packages are installed.
+    """
+    _, extension = os.path.splitext(file_path)
+    if extension.lower() != '.pdf':
+        yield from read_document_pages(file_path)
+        return
+
+    print(f"Streaming PDF pages: {os.path.basename(file_path)}")
+    yield from iter_pdf_pages_hybrid(file_path)
+
 # --- Text Chunking Function ---
 
 def chunk_text(text: str, chunk_size: int = 400, overlap: int = 50) -> list[str]:
@@ -536,17 +569,17 @@ def chunk_pages_to_chunks(pages: list[str], chunk_size: int = 1000, overlap: int
             chunks_with_pages.append((page_text.strip(), page_number))
             print(f"Page {page_number}: single chunk ({len(page_text)} chars)")
         else:
-            # Split long page into multiple chunks
-            start = 0
-            chunk_count = 0
-            while start < len(page_text):
-                end = start + chunk_size
-                chunk = page_text[start:end].strip()
-                if chunk:  # Only add non-empty chunks
-                    chunks_with_pages.append((chunk, page_number))
-                    chunk_count += 1
-                start += chunk_size - overlap
-            print(f"Page {page_number}: split into {chunk_count} chunks ({len(page_text)} chars)")
+            # Split long page with a fixed-stride sliding window
+            stride = chunk_size - overlap
+            starts = list(range(0, max(1, len(page_text) - overlap), stride))
+            # Fold a short trailing fragment into the previous window
+            if len(starts) > 1 and len(page_text) - starts[-1] < chunk_size // 4:
+                starts.pop()
+            windows = [page_text[i:i + chunk_size] for i in starts[:-1]]
+            windows.append(page_text[starts[-1]:])
+            page_chunks = [(chunk, page_number) for chunk in map(str.strip, windows) if chunk]
+            chunks_with_pages.extend(page_chunks)
+            print(f"Page {page_number}: split into {len(page_chunks)} chunks ({len(page_text)} chars)")
     
     print(f"Total chunks created: {len(chunks_with_pages)}")
     return chunks_with_pages
@@ -557,20 +590,27 @@ def get_spacy_nlp():
     """
     Lazy-load spaCy model for sentence segmentation.
     Only loads components needed for sentence boundary detection.
+    The model is loaded once per process; the lock keeps concurrent chunking
+    threads from loading it twice.
     """
     global _spacy_nlp
-    if _spacy_nlp is None:
+    if _spacy_nlp is not None:
+        return _spacy_nlp
+
+    with _spacy_nlp_lock:
+        if _spacy_nlp is not None:
+            return _spacy_nlp
         if not HAS_SPACY:
             raise ImportError("spaCy not available. Install with: pip install spacy && python -m spacy download en_core_web_sm")
         
         model_name = getattr(settings, 'RAG_SPACY_MODEL', 'en_core_web_sm')
         try:
             # Only load sentence boundary detector to save memory
-            _spacy_nlp = spacy.load(model_name, disable=["ner", "tagger", "parser", "lemmatizer"])
+            nlp = spacy.load(model_name, disable=["ner", "tagger", "parser", "attribute_ruler", "lemmatizer"])
             # Ensure a lightweight sentencizer is present so doc.sents works even when parser is disabled
-            if "sentencizer" not in _spacy_nlp.pipe_names:
+            if "sentencizer" not in nlp.pipe_names:
                 try:
-                    _spacy_nlp.add_pipe("sentencizer")
+                    nlp.add_pipe("sentencizer")
                     print(f"✅ Added sentencizer to spaCy pipeline for model: {model_name}")
                 except Exception:
                     print(f"Warning: could not add sentencizer to spaCy model: {model_name}")
@@ -578,6 +618,8 @@ def get_spacy_nlp():
                 print(f"✅ Loaded spaCy model: {model_name} (sentencizer present)")
         except OSError:
             raise ImportError(f"spaCy model '{model_name}' not found. Install with: python -m spacy download {model_name}")
+        # Publish only the fully configured pipeline
+        _spacy_nlp = nlp
     
     return _spacy_nlp
 
@@ -601,7 +643,48 @@ def sentencize_text(text: str) -> list[str]:
     print(f"Split text into {len(sentences)} sentences")
     return sentences
 
-def hybrid_chunk_sentences(sentences: list[str], tokenizer_func, target_tokens: int, overlap_tokens: int) -> list[str]:
+def _spacy_n_process() -> int:
+    """
+    Number of worker processes for nlp.pipe().
+
+    Single-process unless RAG_SPACY_N_PROCESS opts in: each worker reloads the
+    spaCy model, which only pays off for large documents. Always stays
+    single-process on Windows (spawn start method) and inside daemonic
+    processes such as Celery prefork workers, which cannot fork children.
+    """
+    if os.name == 'nt' or multiprocessing.current_process().daemon:
+        return 1
+    return max(1, int(getattr(settings, 'RAG_SPACY_N_PROCESS', None) or 1))
+
+def sentencize_pages(pages, batch_size: int = 64, n_process: int = None):
+    """
+    Sentence-split many pages in bulk via nlp.pipe().
+
+    Args:
+        pages: Iterable of page text strings
+        batch_size: Number of pages spaCy processes per batch
+        n_process: Worker processes for nlp.pipe (see _spacy_n_process if None)
+
+    Yields:
+        (page_number, sentences) for each non-empty page, in page order
+    """
+    nlp = get_spacy_nlp()
+    if n_process is None:
+        n_process = _spacy_n_process()
+
+    def non_empty_pages():
+        for page_number, page_text in enumerate(pages, start=1):
+            if page_text.strip():
+                yield page_text, page_number
+            else:
+                print(f"Page {page_number}: empty, skipping")
+
+    docs = nlp.pipe(non_empty_pages(), as_tuples=True, batch_size=batch_size, n_process=n_process)
+    for doc, page_number in docs:
+        yield page_number, [sent.text.strip() for sent in doc.sents if sent.text.strip()]
+
+def hybrid_chunk_sentences(sentences: list[str], tokenizer_func, target_tokens: int, overlap_tokens: int,
+                           with_token_counts: bool = False) -> list:
     """
     Create chunks from sentences using token-aware boundaries with overlap.
     
@@ -610,14 +693,17 @@ def hybrid_chunk_sentences(sentences: list[str], tokenizer_func, target_tokens:
         tokenizer_func: Function that takes a text string and returns token count
         target_tokens: Target number of tokens per chunk
         overlap_tokens: Number of tokens to overlap between chunks
+        with_token_counts: Return (chunk_text, token_count) pairs instead of strings
         
     Returns:
-        List of chunk strings (joined sentences)
+        List of chunk strings (joined sentences), or (chunk_text, token_count)
+        pairs when with_token_counts is True
     """
     if not sentences:
         return []
     
     chunks = []
+    chunk_token_counts = []
     current_chunk_sentences = []
     current_chunk_tokens = 0
     
@@ -629,6 +715,7 @@ def hybrid_chunk_sentences(sentences: list[str], tokenizer_func, target_tokens:
             # Finalize current chunk
             chunk_text = " ".join(current_chunk_sentences)
             chunks.append(chunk_text)
+            chunk_token_counts.append(current_chunk_tokens)
             print(f"Chunk {len(chunks)}: {current_chunk_tokens} tokens, {len(current_chunk_sentences)} sentences")
             
             # Create overlap for next chunk
@@ -659,6 +746,7 @@ def hybrid_chunk_sentences(sentences: list[str], tokenizer_func, target_tokens:
             # Allow it as its own chunk
             chunk_text = sentence
             chunks.append(chunk_text)
+            chunk_token_counts.append(sentence_tokens)
             print(f"Chunk {len(chunks)}: {sentence_tokens} tokens (oversized), 1 sentence")
             current_chunk_sentences = []
             current_chunk_tokens = 0
@@ -667,12 +755,15 @@ def hybrid_chunk_sentences(sentences: list[str], tokenizer_func, target_tokens:
     if current_chunk_sentences:
         chunk_text = " ".join(current_chunk_sentences)
         chunks.append(chunk_text)
+        chunk_token_counts.append(current_chunk_tokens)
         print(f"Chunk {len(chunks)} (final): {current_chunk_tokens} tokens, {len(current_chunk_sentences)} sentences")
     
     print(f"✅ Created {len(chunks)} token-aware chunks from {len(sentences)} sentences")
+    if with_token_counts:
+        return list(zip(chunks, chunk_token_counts))
     return chunks
 
-def token_chunk_pages_to_chunks(pages: list[str], target_tokens: int = None, overlap_tokens: int = None) -> list[tuple[str, int]]:
+def token_chunk_pages_to_chunks(pages: list[str], target_tokens: int = None, overlap_tokens: int = None) -> list[tuple[str, int, int]]:
     """
     Convert pages to token-aware chunks with sentence boundaries and page metadata.
     
@@ -682,7 +773,19 @@ def token_chunk_pages_to_chunks(pages: list[str], target_tokens: int = None, ove
         overlap_tokens: Overlap tokens between chunks (from settings if None)
         
     Returns:
-        List of (chunk_text, page_number) tuples
+        List of (chunk_text, page_number, token_count) tuples; token_count is
+        the chunker's own count, so callers need not re-tokenize
+    """
+    chunks_with_pages = list(token_chunk_pages_to_chunks_iter(pages, target_tokens, overlap_tokens))
+    print(f"✅ Token chunking complete: {len(chunks_with_pages)} chunks from {len(pages)} pages")
+    return chunks_with_pages
+
+def token_chunk_pages_to_chunks_iter(pages, target_tokens: int = None, overlap_tokens: int = None):
+    """
+    Generator variant of token_chunk_pages_to_chunks().
+
+    Accepts any iterable of page texts (e.g. read_document_pages_iter()) and
+    yields (chunk_text, page_number, token_count) tuples as each page is chunked.
     """
     if target_tokens is None:
         target_tokens = getattr(settings, 'RAG_TOKEN_CHUNK_SIZE', 400)
@@ -695,32 +798,23 @@ def token_chunk_pages_to_chunks(pages: list[str], target_tokens: int = None, ove
     def tokenizer_func(text: str) -> int:
         return gemini_client.count_tokens(text)
     
-    chunks_with_pages = []
-    
-    for page_idx, page_text in enumerate(pages):
-        page_number = page_idx + 1
-        
-        if not page_text.strip():
-            print(f"Page {page_number}: empty, skipping")
-            continue
-        
-        # Split page into sentences
-        sentences = sentencize_text(page_text)
+    # Split pages into sentences in batches (across worker processes where
+    # possible) rather than one nlp() call per page
+    for page_number, sentences in sentencize_pages(pages, batch_size=32):
         if not sentences:
             print(f"Page {page_number}: no sentences found, skipping")
             continue
         
         # Create token-aware chunks from sentences
-        page_chunks = hybrid_chunk_sentences(sentences, tokenizer_func, target_tokens, overlap_tokens)
+        page_chunks = hybrid_chunk_sentences(
+            sentences, tokenizer_func, target_tokens, overlap_tokens, with_token_counts=True
+        )
         
         # Add page metadata to chunks
-        for chunk_text in page_chunks:
-            chunks_with_pages.append((chunk_text, page_number))
+        for chunk_text, token_count in page_chunks:
+            yield chunk_text, page_number, token_count
         
         print(f"Page {page_number}: {len(sentences)} sentences -> {len(page_chunks)} chunks")
-    
-    print(f"✅ Token chunking complete: {len(chunks_with_pages)} chunks from {len(pages)} pages")
-    return chunks_with_pages
 
 # --- OPTIMIZED Token-Aware Chunking (Parallelized & Batch-Efficient) ---
 
@@ -1033,7 +1127,8 @@ def ingest_document_from_s3(s3_key: str, user_id: str):
             print("Warning: No chunks generated from document.")
             return False
             
-        chunks = [chunk_text for chunk_text, page_num in chunks_with_pages]
+        # Token chunker yields (text, page, tokens); legacy/optimized yield (text, page)
+        chunks = [item[0] for item in chunks_with_pages]
         print(f"Document processed: {len(pages)} pages -> {len(chunks)} chunks")
         
         # Log a preview of the first chunk
@@ -1116,6 +1211,8 @@ def ingest_document_from_s3(s3_key: str, user_id: str):
         # Use safe_upsert which respects Pinecone per-request size limits
         safe_upsert(index, vectors, namespace=tenant_tag)
         print("Upsert complete.")
+        # Cached answers predate this document
+        bump_tenant_cache_version(tenant_tag)
         return True
     except Exception as e:
         print(f"Error upserting to Pinecone: {e}")
@@ -1129,11 +1226,15 @@ def ingest_document_from_s3(s3_key: str, user_id: str):
         })
         return False
     
-def ingest_document(file_path: str, user_id: str):
+def ingest_document(file_path: str | None, user_id: str, content: str | None = None):
     """
     Legacy function for backward compatibility - processes local file directly.
+
+    When `content` is given the text is ingested as a single page and nothing
+    is read from disk; `file_path` is then optional and only names the source.
     """
-    print(f"Starting ingestion for user {user_id}, file {file_path}...")
+    source = file_path or "in-memory content"
+    print(f"Starting ingestion for user {user_id}, file {source}...")
 
     # 1. Get tenant tag (namespace)
     tenant_tag = get_tenant_tag(user_id)
@@ -1141,7 +1242,10 @@ def ingest_document(file_path: str, user_id: str):
 
     # 2. Read and chunk the document using page-aware approach
     try:
-        pages = read_document_pages(file_path)
+        if content is not None:
+            pages = [content] if content.strip() else []
+        else:
+            pages = read_document_pages(file_path)
         if not pages or not any(page.strip() for page in pages):
             print("Warning: Document is empty or could not be read.")
             return
@@ -1192,7 +1296,8 @@ def ingest_document(file_path: str, user_id: str):
             print("Warning: No chunks generated from document.")
             return
             
-        chunks = [chunk_text for chunk_text, page_num in chunks_with_pages]
+        # Token chunker yields (text, page, tokens); legacy/optimized yield (text, page)
+        chunks = [item[0] for item in chunks_with_pages]
         print(f"Document processed: {len(pages)} pages -> {len(chunks)} chunks")
         
         # Log a preview of the first chunk
@@ -1224,7 +1329,11 @@ def ingest_document(file_path: str, user_id: str):
 
     # 5. Prepare vectors for upsert with page metadata
     vectors = []
-    source_doc_id = os.path.basename(file_path)
+    if file_path:
+        source_doc_id = os.path.basename(file_path)
+    else:
+        # Deterministic per content, so re-ingesting the same text overwrites it
+        source_doc_id = f"inline-{hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]}"
     for i, chunk in enumerate(chunks):
         # Find the corresponding page number for this chunk
         page_number = chunks_with_pages[i][1] if i < len(chunks_with_pages) else 1
@@ -1247,6 +1356,8 @@ def ingest_document(file_path: str, user_id: str):
         print(f"Upserting {len(vectors)} vectors to Pinecone namespace: {tenant_tag}...")
         safe_upsert(index, vectors, namespace=tenant_tag)
         print("Upsert complete.")
+        # Cached answers predate this document
+        bump_tenant_cache_version(tenant_tag)
     except Exception as e:
         print(f"Error upserting to Pinecone: {e}")
 
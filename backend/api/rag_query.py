@@ -2,10 +2,12 @@ from django.conf import settings
 from .auth import get_tenant_tag
 from .rag_ingestion import initialize_pinecone, get_embedding_client
 from .gemini_client import gemini_client
+from .embedding_cache import get_semantic_cache, get_tenant_cache_version
 from .tanglish_prompts import strip_gamification_prefix
 from .models import Document, TutoringQuestionBatch, ChatSession
 import json
 import sentry_sdk
+from concurrent.futures import ThreadPoolExecutor
 
 # NOTE: The legacy batch generation helpers `generate_question_batch_for_session`
 # and `generate_tutoring_question` were removed from this module in favor of
@@ -31,11 +33,7 @@ def query_rag(user_id: str, query: str, top_k: int = 5, language: str = "tanglis
     """
     print(f"Starting RAG query for user {user_id} with language={language}...")
 
-    # 1. Get tenant tag (namespace)
-    tenant_tag = get_tenant_tag(user_id)
-    print(f"Generated tenant tag: {tenant_tag}")
-
-    # 2. Initialize models and index
+    # 1. Initialize models and index
     try:
         embedding_client = get_embedding_client()
         index = initialize_pinecone()
@@ -44,7 +42,7 @@ def query_rag(user_id: str, query: str, top_k: int = 5, language: str = "tanglis
         print(f"Error initializing embedding client or Pinecone: {e}")
         return "Error: Could not initialize backend services."
 
-    # 3. Embed the query
+    # 2. Embed the query
     try:
         print("Embedding query...")
         query_embeddings = embedding_client.get_embeddings([query])
@@ -54,6 +52,98 @@ def query_rag(user_id: str, query: str, top_k: int = 5, language: str = "tanglis
         print(f"Error encoding query: {e}")
         return "Error: Could not process your query."
 
+    return query_rag_with_embedding(user_id, query, query_embedding, top_k=top_k, language=language, index=index)
+
+
+def query_rag_batch(user_id: str, queries: list[str], top_k: int = 5, language: str = "tanglish") -> list[str]:
+    """
+    Answers several queries for one user, returning responses in query order.
+
+    All queries are embedded with a single `get_embeddings` call and share one
+    Pinecone index handle; the per-query retrieval + LLM round trips then run
+    concurrently. (Pinecone's query API takes one vector per request, so the
+    vector searches themselves cannot be merged into a single call.)
+
+    Args:
+        user_id: User ID for tenant isolation
+        queries: Query texts
+        top_k: Number of top results to retrieve per query
+        language: Preferred language for responses (tanglish, english, etc.)
+    """
+    if not queries:
+        return []
+    print(f"Starting batch RAG query for user {user_id}: {len(queries)} queries, language={language}...")
+
+    try:
+        embedding_client = get_embedding_client()
+        index = initialize_pinecone()
+    except Exception as e:
+        print(f"Error initializing embedding client or Pinecone: {e}")
+        return ["Error: Could not initialize backend services."] * len(queries)
+
+    try:
+        query_embeddings = embedding_client.get_embeddings(queries)
+    except Exception as e:
+        print(f"Error encoding queries: {e}")
+        return ["Error: Could not process your query."] * len(queries)
+
+    with ThreadPoolExecutor(max_workers=min(len(queries), 8)) as ex:
+        return list(ex.map(
+            lambda item: query_rag_with_embedding(user_id, item[0], item[1], top_k=top_k, language=language, index=index),
+            zip(queries, query_embeddings)
+        ))
+
+
+def query_rag_with_embedding(user_id: str, query: str, query_embedding: list[float], top_k: int = 5,
+                             language: str = "tanglish", index=None) -> str:
+    """
+    Queries the RAG system with a precomputed query embedding.
+
+    Lets callers embed many queries in one `get_embeddings` call and skip the
+    per-query embedding round trip; `index` may be passed to reuse an
+    already-initialized Pinecone index.
+
+    Args:
+        user_id: User ID for tenant isolation
+        query: Query text
+        query_embedding: Embedding vector for `query`
+        top_k: Number of top results to retrieve
+        language: Preferred language for response (tanglish, english, etc.)
+        index: Optional Pinecone index (initialized when omitted)
+    """
+    # 3. Get tenant tag (namespace)
+    tenant_tag = get_tenant_tag(user_id)
+    print(f"Generated tenant tag: {tenant_tag}")
+
+    # Reuse the answer to a near-identical earlier query from the same tenant
+    semantic_cache = get_semantic_cache()
+    cache_key = f"{tenant_tag}:{language}:{top_k}"
+    if semantic_cache is not None:
+        # Answers cached before the tenant's documents last changed are dropped
+        cache_version = get_tenant_cache_version(tenant_tag)
+        cached_response = semantic_cache.lookup(cache_key, query_embedding, cache_version)
+        if cached_response is not None:
+            print("Semantic cache hit; returning cached answer.")
+            return cached_response
+
+    response = _answer_from_index(user_id, tenant_tag, query, query_embedding, top_k, language, index)
+
+    # Transient failures are not cached
+    if semantic_cache is not None and not response.startswith(("Error:", "I could not find any relevant information")):
+        semantic_cache.add(cache_key, query_embedding, response, cache_version)
+    return response
+
+
+def _answer_from_index(user_id: str, tenant_tag: str, query: str, query_embedding: list[float], top_k: int,
+                       language: str, index) -> str:
+    """Retrieve tenant context from Pinecone and answer with the LLM (with general-knowledge fallback)"""
+    if index is None:
+        try:
+            index = initialize_pinecone()
+        except Exception as e:
+            print(f"Error initializing Pinecone: {e}")
+            return "Error: Could not initialize backend services."
+
     # 4. Retrieve from Pinecone using namespace with strict tenant filtering
     try:
         print(f"Querying Pinecone namespace {tenant_tag} with top_k={top_k}...")
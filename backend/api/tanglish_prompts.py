@@ -3,9 +3,13 @@ Tanglish Agent System Prompts
 Exact prompts from specification for Intent Classifier, Question Generator, and Answer Evaluator
 """
 
+import functools
+import re
+
 from .language_prompts import REQUIRED_OUTPUT_FORMATS as LANG_REQUIRED_OUTPUT_FORMATS, GAMIFICATION_WRAPPERS as LANG_GAMIFICATION_WRAPPERS
 
 # § 2 — Intent Classifier System Prompt (use Gemini 2.0 Flash)
+@functools.lru_cache(maxsize=8)
 def get_intent_classifier_system_prompt(language: str = "tanglish") -> str:
     """Get intent classifier system prompt with dynamic language."""
     # Improve prompt clarity and precedence: prefer RETURN_QUESTION for clear questions
@@ -27,38 +31,42 @@ Examples (input -> expected token):
 - Handle {language} or English. Do not explain. Return ONLY the token."""
 
 # Intent Classifier Fallback Rules (deterministic)
+# Question indicators - expanded list
+_QUESTION_MARKERS = [
+    '?', 'why', 'how', 'what', 'when', 'where', 'who', 'which', 'whom',
+    'is', 'are', 'can', 'could', 'would', 'should', 'do', 'does', 'did',
+    'means', 'mean', 'meaning'  # Added for "what is X means?" patterns
+]
+_TANGLISH_QUESTION_WORDS = [
+    'enna', 'sari', 'purinjudha', 'epadi', 'eppadi', 'ethuku', 'yaar',
+    'na', 'nu'  # Common Tanglish question markers
+]
+# All markers (plain substrings, as before) in one alternation, so a message
+# is scanned once instead of once per marker
+_QUESTION_MARKER_RE = re.compile('|'.join(map(re.escape, _QUESTION_MARKERS + _TANGLISH_QUESTION_WORDS)))
+_QUESTION_START_WORDS = frozenset(['what', 'why', 'how', 'when', 'where', 'who', 'which', 'is', 'are', 'can', 'could', 'do', 'does'])
+
 def fallback_intent_classifier(user_message: str) -> str:
     """
     Fallback deterministic rule when Gemini API fails.
     Checks for presence of question markers or clarification words.
     """
     msg_lower = user_message.lower()
+    words = msg_lower.split()
     
     print(f"[FALLBACK] Classifying: '{user_message}'")
     
-    # Question indicators - expanded list
-    question_markers = [
-        '?', 'why', 'how', 'what', 'when', 'where', 'who', 'which', 'whom',
-        'is', 'are', 'can', 'could', 'would', 'should', 'do', 'does', 'did',
-        'means', 'mean', 'meaning'  # Added for "what is X means?" patterns
-    ]
-    tanglish_question_words = [
-        'enna', 'sari', 'purinjudha', 'epadi', 'eppadi', 'ethuku', 'yaar',
-        'na', 'nu'  # Common Tanglish question markers
-    ]
-    
     # Check if message starts with question words (strong indicator)
-    first_word = msg_lower.split()[0] if msg_lower.split() else ''
-    starts_with_question = first_word in ['what', 'why', 'how', 'when', 'where', 'who', 'which', 'is', 'are', 'can', 'could', 'do', 'does']
+    first_word = words[0] if words else ''
+    starts_with_question = first_word in _QUESTION_START_WORDS
     
     # Check for any question markers
-    has_question = any(marker in msg_lower for marker in question_markers + tanglish_question_words)
+    has_question = _QUESTION_MARKER_RE.search(msg_lower) is not None
     
     print(f"[FALLBACK] starts_with_question: {starts_with_question}, has_question: {has_question}")
     
     # Strong question indicators
     if starts_with_question or '?' in user_message:
-        words = msg_lower.split()
         if len(words) > 15:  # Very long - might contain both answer and question
             print(f"[FALLBACK] → MIXED (long message with question)")
             return "MIXED"
@@ -69,7 +77,6 @@ def fallback_intent_classifier(user_message: str) -> str:
     # Weak question indicators
     if has_question:
         # Check if message also contains non-question content (potential answer)
-        words = msg_lower.split()
         if len(words) > 12:  # Longer messages might contain both answer and question
             print(f"[FALLBACK] → MIXED (answer + question)")
             return "MIXED"
@@ -87,6 +94,7 @@ def fallback_intent_classifier(user_message: str) -> str:
 
 
 # § 3 — Question Generator System Prompt
+@functools.lru_cache(maxsize=8)
 def get_question_generator_system_prompt(language: str = "tanglish") -> str:
     """Get question generator system prompt with dynamic language."""
     language_instruction = "Output SHOULD be in {language}."
@@ -97,6 +105,7 @@ def get_question_generator_system_prompt(language: str = "tanglish") -> str:
 {language_instruction} Keep language simple and human-like."""
 
 # Question Generator Detailed Instructions
+@functools.lru_cache(maxsize=8)
 def get_question_generator_instructions(language: str = "tanglish") -> str:
     """Get question generator instructions with dynamic language."""
     language_phrasing = f"Use {language} phrasing"
@@ -147,8 +156,9 @@ RULES for generation (must be implemented):
 {gamification}
 """
 
-def build_question_generation_prompt(context: str, total_questions: int = 10, language: str = "tanglish") -> str:
-    """Build the complete question generation prompt with context and language"""
+@functools.lru_cache(maxsize=8)
+def _question_generation_prefix(language: str) -> str:
+    """Language-dependent template text that precedes the context (cached)"""
     system_prompt = get_question_generator_system_prompt(language)
     instructions = get_question_generator_instructions(language)
     
@@ -157,18 +167,24 @@ def build_question_generation_prompt(context: str, total_questions: int = 10, la
 {instructions}
 
 EDUCATIONAL CONTEXT:
-{context}
+"""
+
+def build_question_generation_prompt(context: str, total_questions: int = 10, language: str = "tanglish") -> str:
+    """Build the complete question generation prompt with context and language"""
+    return f"""{_question_generation_prefix(language)}{context}
 
 Generate exactly {total_questions} unique questions as a JSON array:"""
 
 
 # § 4 — Answer Evaluator (Gemini Judge) System Prompt
+@functools.lru_cache(maxsize=8)
 def get_answer_evaluator_system_prompt(language: str = "tanglish") -> str:
     """Get answer evaluator system prompt with dynamic language."""
     return f"""You are an answer evaluator for university learners. Use CONTEXT to judge correctness.
 Return JSON with keys: correct, score, explanation ({language}), confidence, followup_action, return_question_answer."""
 
 # Answer Evaluator Detailed Instructions
+@functools.lru_cache(maxsize=8)
 def get_answer_evaluator_instructions(language: str = "tanglish") -> str:
     """Get answer evaluator instructions with dynamic language."""
     return f"""
@@ -199,8 +215,9 @@ EXAMPLE OUTPUT:
 }}
 """
 
-def build_evaluation_prompt(context: str, expected_answer: str, student_answer: str, language: str = "tanglish") -> str:
-    """Build the complete answer evaluation prompt with language"""
+@functools.lru_cache(maxsize=8)
+def _evaluation_prefix(language: str) -> str:
+    """Language-dependent template text that precedes the context (cached)"""
     system_prompt = get_answer_evaluator_system_prompt(language)
     instructions = get_answer_evaluator_instructions(language)
     
@@ -209,7 +226,11 @@ def build_evaluation_prompt(context: str, expected_answer: str, student_answer:
 {instructions}
 
 CONTEXT:
-{context}
+"""
+
+def build_evaluation_prompt(context: str, expected_answer: str, student_answer: str, language: str = "tanglish") -> str:
+    """Build the complete answer evaluation prompt with language"""
+    return f"""{_evaluation_prefix(language)}{context}
 
 EXPECTED ANSWER:
 {expected_answer}
@@ -223,6 +244,7 @@ Evaluate now and return JSON:"""
 
 
 # Tanglish Style Guidelines (for reference)
+@functools.lru_cache(maxsize=8)
 def get_tanglish_style_rules(language: str = "tanglish") -> str:
     """Get style rules with dynamic language."""
     language_instructions = f"Use {language} for learner-facing content."
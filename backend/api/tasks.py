@@ -4,6 +4,8 @@ Celery Tasks for InzightedG
 This module contains asynchronous tasks for document processing pipeline:
 - Document ingestion (extraction, chunking, embedding, Pinecone upload)
 - Background processing for uploaded documents
+- Session finalization (insights + XP) after a tutoring session ends
+- Insight regeneration for already finalized sessions
 
 All tasks are designed to be idempotent and include comprehensive error handling.
 """
@@ -14,16 +16,22 @@ from celery import shared_task
 from django.conf import settings
 import sentry_sdk
 
+from hellotutor.celery_app import TRANSIENT_EXCEPTIONS, is_transient
+from .embedding_cache import bump_tenant_cache_version
 from .models import Document
 from .rag_ingestion import ingest_document_from_s3
 
 logger = logging.getLogger(__name__)
 
 
+class IngestionFailedError(Exception):
+    """Raised when the ingestion pipeline reports failure without raising."""
+
+
 @shared_task(
     bind=True,
     name='api.tasks.process_document',
-    autoretry_for=(Exception,),
+    autoretry_for=TRANSIENT_EXCEPTIONS + (IngestionFailedError,),
     retry_kwargs={'max_retries': 3},
     retry_backoff=True,
     retry_backoff_max=600,
@@ -52,7 +60,8 @@ def process_document(self, s3_key: str, user_id: str, document_id: str):
         dict: Status information about the processing result
         
     Raises:
-        Exception: Any exception during processing (triggers retry with backoff)
+        Exception: Transient errors trigger retry with backoff; anything else
+            fails immediately and is reported to Sentry
         
     Retry Strategy:
         - Max retries: 3
@@ -129,7 +138,7 @@ def process_document(self, s3_key: str, user_id: str, document_id: str):
         success = ingest_document_from_s3(s3_key, user_id)
         
         if not success:
-            raise Exception("Document ingestion returned False (processing failed)")
+            raise IngestionFailedError("Document ingestion returned False (processing failed)")
         
         # Update status to completed
         document.status = 'completed'
@@ -184,8 +193,10 @@ def process_document(self, s3_key: str, user_id: str, document_id: str):
             'elapsed_time': elapsed_time,
         })
         
-        # Update document status to failed if this is the last retry
-        if retry_count >= 2:  # 0, 1, 2 = 3 total attempts
+        # Update document status to failed if this is the last retry or the
+        # error is not retryable (it will not be attempted again)
+        retryable = is_transient(e) or isinstance(e, IngestionFailedError)
+        if retry_count >= 2 or not retryable:  # 0, 1, 2 = 3 total attempts
             try:
                 document = Document.objects.get(id=document_id)
                 document.status = 'failed'
@@ -199,14 +210,14 @@ def process_document(self, s3_key: str, user_id: str, document_id: str):
                     f"[Task {task_id}] Failed to update document status: {update_error}"
                 )
         
-        # Re-raise to trigger Celery retry mechanism
+        # Re-raise to trigger Celery retry mechanism (transient errors only)
         raise
 
 
 @shared_task(
     bind=True,
     name='api.tasks.batch_process_documents',
-    autoretry_for=(Exception,),
+    autoretry_for=TRANSIENT_EXCEPTIONS,
     retry_kwargs={'max_retries': 2},
 )
 def batch_process_documents(self, document_data_list: list):
@@ -276,7 +287,7 @@ def cleanup_expired_sessions():
 @shared_task(
     bind=True,
     name='api.tasks.delete_document_vectors',
-    autoretry_for=(Exception,),
+    autoretry_for=TRANSIENT_EXCEPTIONS,
     retry_kwargs={'max_retries': 3},
     retry_backoff=True,
     retry_backoff_max=600,
@@ -300,7 +311,8 @@ def delete_document_vectors(self, document_id: str, user_id: str, deleted_by_id:
         dict: Deletion result with vector count and status
         
     Raises:
-        Exception: Any exception during deletion (triggers retry with backoff)
+        Exception: Transient errors trigger retry with backoff; anything else
+            fails immediately and is reported to Sentry
         
     Retry Strategy:
         - Max retries: 3
@@ -394,6 +406,8 @@ def delete_document_vectors(self, document_id: str, user_id: str, deleted_by_id:
         try:
             # Pinecone delete with filter and namespace
             index.delete(filter=filter_expr, namespace=tenant_tag)
+            # Cached answers may quote the deleted document
+            bump_tenant_cache_version(tenant_tag)
             
             elapsed_time = time.time() - start_time
             logger.info(
@@ -441,7 +455,7 @@ def delete_document_vectors(self, document_id: str, user_id: str, deleted_by_id:
                 f"[Task {task_id}] Pinecone deletion failed: {pinecone_error}",
                 exc_info=True
             )
-            raise  # Re-raise to trigger retry
+            raise  # Handled below: status bookkeeping, then re-raised for Celery
         
     except Exception as e:
         elapsed_time = time.time() - start_time
@@ -464,8 +478,9 @@ def delete_document_vectors(self, document_id: str, user_id: str, deleted_by_id:
             'elapsed_time': elapsed_time,
         })
         
-        # Update document status to delete_failed if this is the last retry
-        if retry_count >= 2:  # 0, 1, 2 = 3 total attempts
+        # Update document status to delete_failed if this is the last retry or
+        # the error is not retryable (it will not be attempted again)
+        if retry_count >= 2 or not is_transient(e):  # 0, 1, 2 = 3 total attempts
             try:
                 document = Document.objects.get(id=document_id)
                 document.status = 'delete_failed'
@@ -479,10 +494,131 @@ def delete_document_vectors(self, document_id: str, user_id: str, deleted_by_id:
                     f"[Task {task_id}] Failed to update document status: {update_error}"
                 )
         
-        # Re-raise to trigger Celery retry mechanism
+        # Re-raise to trigger Celery retry mechanism (transient errors only)
         raise
 
 
+@shared_task(
+    bind=True,
+    name='api.tasks.finalize_session',
+    autoretry_for=TRANSIENT_EXCEPTIONS,
+    retry_kwargs={'max_retries': 3},
+    retry_backoff=True,
+    retry_backoff_max=600,
+    retry_jitter=True,
+    acks_late=True,
+    reject_on_worker_lost=True,
+)
+def finalize_session(self, session_id: str):
+    """
+    Generate BoostMe insights and apply session XP for a completed session.
+    
+    Args:
+        session_id (str): UUID of the ChatSession to finalize
+        
+    Returns:
+        dict: Insight status and XP processing summary
+        
+    Idempotency:
+        - SessionInsight is written with update_or_create (one row per session)
+        - XP is applied only once via the ChatSession.xp_processed_at claim
+        - Safe to retry after transient LLM failures or a lost worker
+    """
+    from .models import ChatSession
+    from .insight_generator import generate_insights_for_session
+    from .progress import process_session_completion
+    
+    task_id = self.request.id
+    retry_count = self.request.retries
+    
+    logger.info(
+        f"[Task {task_id}] Finalizing session "
+        f"(attempt {retry_count + 1}/4): session_id={session_id}"
+    )
+    
+    try:
+        session = ChatSession.objects.select_related('user', 'document').get(id=session_id)
+    except ChatSession.DoesNotExist:
+        error_msg = f"Session {session_id} not found in database"
+        logger.error(f"[Task {task_id}] {error_msg}")
+        sentry_sdk.capture_message(error_msg, level='error')
+        return {
+            'success': False,
+            'error': error_msg,
+            'session_id': session_id,
+        }
+    
+    try:
+        insight = generate_insights_for_session(session, raise_errors=True)
+    except Exception as e:
+        if is_transient(e):
+            # Let Celery retry; XP has not been claimed yet, so the rerun is safe
+            raise
+        # Already reported to Sentry; a permanent failure must not block XP
+        insight = None
+    xp_result = process_session_completion(session)
+    
+    return {
+        'success': True,
+        'session_id': session_id,
+        'insight_status': insight.status if insight else 'failed',
+        'xp_result': xp_result,
+        'retry_count': retry_count,
+    }
+
+
+@shared_task(
+    bind=True,
+    name='api.tasks.regenerate_session_insights',
+    autoretry_for=TRANSIENT_EXCEPTIONS,
+    retry_kwargs={'max_retries': 3},
+    retry_backoff=True,
+    retry_backoff_max=600,
+    retry_jitter=True,
+    acks_late=True,
+    reject_on_worker_lost=True,
+)
+def regenerate_session_insights(self, session_id: str):
+    """
+    Regenerate the BoostMe insight of an already finalized session.
+    
+    Unlike finalize_session this never touches XP, stars or batches, so it is
+    safe to run over historical sessions (e.g. after a prompt change).
+    
+    Args:
+        session_id (str): UUID of the ChatSession whose insight is rebuilt
+        
+    Returns:
+        dict: Insight status
+    """
+    from .models import ChatSession
+    from .insight_generator import generate_insights_for_session
+    
+    task_id = self.request.id
+    
+    try:
+        session = ChatSession.objects.select_related('user', 'document').get(id=session_id)
+    except ChatSession.DoesNotExist:
+        error_msg = f"Session {session_id} not found in database"
+        logger.error(f"[Task {task_id}] {error_msg}")
+        return {
+            'success': False,
+            'error': error_msg,
+            'session_id': session_id,
+        }
+    
+    # Transient errors propagate so Celery retries; the insight row is
+    # overwritten in place, so reruns are idempotent
+    insight = generate_insights_for_session(session, raise_errors=True)
+    
+    return {
+        'success': insight is not None,
+        'session_id': session_id,
+        'insight_status': insight.status if insight else 'failed',
+        'retry_count': self.request.retries,
+    }
+
+
 @shared_task(name='api.tasks.test_celery')
 def test_celery():
     """
@@ -0,0 +1,101 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from django.core.cache import cache
+from django.test import override_settings
+
+from api import embedding_cache
+from api.embedding_cache import (
+    HAS_HNSWLIB, SemanticCache, bump_tenant_cache_version, get_or_compute, get_tenant_cache_version,
+)
+
+
+class _DictCache(dict):
+    """Minimal stand-in for diskcache.Cache (get/set)"""
+
+    def set(self, key, value):
+        self[key] = value
+
+
+class TestEmbeddingCache(unittest.TestCase):
+
+    def test_disabled_cache_computes_everything(self):
+        """Without a cache directory every text goes to compute"""
+        compute = MagicMock(side_effect=lambda texts: [[float(len(t))] for t in texts])
+        with patch.object(embedding_cache, '_get_disk_cache', return_value=None):
+            embeddings = get_or_compute(["a", "bb"], compute)
+
+        self.assertEqual(embeddings, [[1.0], [2.0]])
+        compute.assert_called_once_with(["a", "bb"])
+
+    def test_only_distinct_misses_are_computed(self):
+        """Cached texts are served from the cache; misses are deduplicated"""
+        cache = _DictCache()
+        compute = MagicMock(side_effect=lambda texts: [[float(len(t))] for t in texts])
+        with patch.object(embedding_cache, '_get_disk_cache', return_value=cache):
+            get_or_compute(["a"], compute)
+            embeddings = get_or_compute(["a", "bb", "bb", "ccc"], compute)
+
+        self.assertEqual(embeddings, [[1.0], [2.0], [2.0], [3.0]])
+        self.assertEqual(compute.call_args_list[-1].args[0], ["bb", "ccc"])
+        self.assertEqual(len(cache), 3)
+
+
+class TestSemanticCache(unittest.TestCase):
+    """Brute-force NumPy backend"""
+    use_hnsw = False
+
+    def setUp(self):
+        self.cache = SemanticCache(threshold=0.95, max_entries=2, use_hnsw=self.use_hnsw)
+
+    def test_similar_query_hits(self):
+        self.cache.add("tenant_a", [1.0, 0.0, 0.0], "answer")
+        self.assertEqual(self.cache.lookup("tenant_a", [2.0, 0.1, 0.0]), "answer")
+
+    def test_dissimilar_query_misses(self):
+        self.cache.add("tenant_a", [1.0, 0.0, 0.0], "answer")
+        self.assertIsNone(self.cache.lookup("tenant_a", [0.0, 1.0, 0.0]))
+
+    def test_entries_do_not_cross_partitions(self):
+        self.cache.add("tenant_a", [1.0, 0.0, 0.0], "answer")
+        self.assertIsNone(self.cache.lookup("tenant_b", [1.0, 0.0, 0.0]))
+
+    def test_oldest_entries_are_evicted(self):
+        self.cache.add("tenant_a", [1.0, 0.0, 0.0], "first")
+        self.cache.add("tenant_a", [0.0, 1.0, 0.0], "second")
+        self.cache.add("tenant_a", [0.0, 0.0, 1.0], "third")
+
+        self.assertIsNone(self.cache.lookup("tenant_a", [1.0, 0.0, 0.0]))
+        self.assertEqual(self.cache.lookup("tenant_a", [0.0, 0.0, 1.0]), "third")
+
+    def test_newer_version_drops_stale_answers(self):
+        self.cache.add("tenant_a", [1.0, 0.0, 0.0], "answer", version=0)
+        self.assertIsNone(self.cache.lookup("tenant_a", [1.0, 0.0, 0.0], version=1))
+
+        # The stale partition is gone, so the old version no longer hits either
+        self.assertIsNone(self.cache.lookup("tenant_a", [1.0, 0.0, 0.0], version=0))
+
+
+@unittest.skipUnless(HAS_HNSWLIB, "hnswlib not installed")
+class TestSemanticCacheHnsw(TestSemanticCache):
+    """HNSW index backend"""
+    use_hnsw = True
+
+
+class TestTenantCacheVersion(unittest.TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(RAG_SEMANTIC_CACHE_THRESHOLD=0.95)
+    def test_bump_increments_only_that_tenant(self):
+        bump_tenant_cache_version("tenant_a")
+        bump_tenant_cache_version("tenant_a")
+
+        self.assertEqual(get_tenant_cache_version("tenant_a"), 2)
+        self.assertEqual(get_tenant_cache_version("tenant_b"), 0)
+
+    @override_settings(RAG_SEMANTIC_CACHE_THRESHOLD=None)
+    def test_bump_is_noop_when_cache_disabled(self):
+        bump_tenant_cache_version("tenant_a")
+        self.assertEqual(get_tenant_cache_version("tenant_a"), 0)
@@ -14,12 +14,11 @@ User = get_user_model()
 class SessionFeedbackAPITestCase(TestCase):
     """Test cases for SessionFeedback API endpoints"""
 
-    def setUp(self):
-        """Set up test data"""
-        self.client = APIClient()
-        
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once for the class (rolled back after each test)"""
         # Create test user
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             email='test@example.com',
             username='testuser',
             password='testpass123',
@@ -27,13 +26,15 @@ class SessionFeedbackAPITestCase(TestCase):
         )
         
         # Create test session
-        self.session = ChatSession.objects.create(
-            user=self.user,
+        cls.session = ChatSession.objects.create(
+            user=cls.user,
             title='Test Tutoring Session',
             language='tanglish'
         )
-        
-        # Authenticate
+
+    def setUp(self):
+        """Authenticate a fresh client per test"""
+        self.client = APIClient()
         self.client.force_authenticate(user=self.user)
 
     def test_submit_feedback_success(self):
@@ -157,17 +158,18 @@ class SessionFeedbackAPITestCase(TestCase):
 class SessionFeedbackModelTestCase(TestCase):
     """Test cases for SessionFeedback model"""
 
-    def setUp(self):
-        """Set up test data"""
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data once for the class (rolled back after each test)"""
+        cls.user = User.objects.create_user(
             email='model@example.com',
             username='modeluser',
             password='testpass123',
             name='Model Test User'
         )
         
-        self.session = ChatSession.objects.create(
-            user=self.user,
+        cls.session = ChatSession.objects.create(
+            user=cls.user,
             title='Model Test Session',
             language='tanglish'
         )
@@ -1,6 +1,7 @@
 """
 Tests for automatic session timeout functionality
 """
+from unittest.mock import patch
 from django.test import TestCase
 from django.utils import timezone
 from datetime import timedelta
@@ -9,6 +10,7 @@ from api.models import User, ChatSession, Document
 from api.views.tutoring_views import is_session_expired, end_session_helper
 
 
+@patch('api.tasks.finalize_session.delay')
 class SessionTimeoutTestCase(TestCase):
     """Test automatic session timeout logic"""
     
@@ -21,7 +23,7 @@ class SessionTimeoutTestCase(TestCase):
             name='Test User'
         )
         
-    def test_is_session_expired_returns_false_for_new_session(self):
+    def test_is_session_expired_returns_false_for_new_session(self, mock_delay):
         """Test that newly created sessions are not expired"""
         session = ChatSession.objects.create(
             user=self.user,
@@ -31,7 +33,7 @@ class SessionTimeoutTestCase(TestCase):
         
         self.assertFalse(is_session_expired(session))
     
-    def test_is_session_expired_returns_true_for_old_session(self):
+    def test_is_session_expired_returns_true_for_old_session(self, mock_delay):
         """Test that sessions older than timeout are expired"""
         timeout_mins = getattr(settings, 'SESSION_TIMEOUT_MINS', 15)
         
@@ -48,7 +50,7 @@ class SessionTimeoutTestCase(TestCase):
         
         self.assertTrue(is_session_expired(session))
     
-    def test_is_session_expired_boundary_condition(self):
+    def test_is_session_expired_boundary_condition(self, mock_delay):
         """Test session exactly at timeout boundary"""
         timeout_mins = getattr(settings, 'SESSION_TIMEOUT_MINS', 15)
         
@@ -65,7 +67,7 @@ class SessionTimeoutTestCase(TestCase):
         # At exact boundary, should still be valid (not expired)
         self.assertFalse(is_session_expired(session))
     
-    def test_end_session_helper_marks_session_inactive(self):
+    def test_end_session_helper_marks_session_inactive(self, mock_delay):
         """Test that end_session_helper marks session as inactive"""
         session = ChatSession.objects.create(
             user=self.user,
@@ -81,8 +83,10 @@ class SessionTimeoutTestCase(TestCase):
         self.assertFalse(session.is_active)
         self.assertFalse(result['already_ended'])
         self.assertIsNotNone(result['total_messages'])
+        self.assertEqual(result['insight_status'], 'pending')
+        mock_delay.assert_called_once_with(str(session.id))
     
-    def test_end_session_helper_idempotent(self):
+    def test_end_session_helper_idempotent(self, mock_delay):
         """Test that calling end_session_helper twice is idempotent"""
         session = ChatSession.objects.create(
             user=self.user,
@@ -98,11 +102,12 @@ class SessionTimeoutTestCase(TestCase):
         result2 = end_session_helper(session)
         self.assertTrue(result2['already_ended'])
         
-        # Session should still be inactive
+        # Session should still be inactive and finalized only once
         session.refresh_from_db()
         self.assertFalse(session.is_active)
+        mock_delay.assert_called_once_with(str(session.id))
     
-    def test_end_session_helper_with_messages(self):
+    def test_end_session_helper_with_messages(self, mock_delay):
         """Test end_session_helper counts messages correctly"""
         from api.models import ChatMessage
         
@@ -0,0 +1,31 @@
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+from urllib3.exceptions import ProtocolError
+
+from hellotutor.celery_app import is_transient
+
+
+def _http_error(status_code):
+    response = MagicMock()
+    response.status_code = status_code
+    return requests.exceptions.HTTPError(response=response)
+
+
+class TestIsTransient(unittest.TestCase):
+
+    def test_network_errors_are_transient(self):
+        self.assertTrue(is_transient(requests.exceptions.ConnectionError()))
+        self.assertTrue(is_transient(ProtocolError("Connection aborted")))
+
+    def test_server_errors_and_throttling_are_transient(self):
+        self.assertTrue(is_transient(_http_error(503)))
+        self.assertTrue(is_transient(_http_error(429)))
+
+    def test_client_errors_are_permanent(self):
+        self.assertFalse(is_transient(_http_error(400)))
+        self.assertFalse(is_transient(_http_error(404)))
+
+    def test_programming_errors_are_permanent(self):
+        self.assertFalse(is_transient(KeyError("missing")))
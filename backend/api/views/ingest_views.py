@@ -292,6 +292,7 @@ class DocumentDeleteView(APIView):
 				# Import and execute deletion synchronously
 				from ..auth import get_tenant_tag
 				from ..rag_ingestion import initialize_pinecone
+				from ..embedding_cache import bump_tenant_cache_version
 				
 				tenant_tag = get_tenant_tag(str(request.user.id))
 				source_doc_id = document.s3_key.split('/')[-1] if document.s3_key else str(document.id)
@@ -299,6 +300,7 @@ class DocumentDeleteView(APIView):
 				index = initialize_pinecone()
 				filter_expr = {'source_doc_id': {'$eq': source_doc_id}}
 				index.delete(filter=filter_expr, namespace=tenant_tag)
+				bump_tenant_cache_version(tenant_tag)
 				
 				document.status = 'deleted'
 				document.save(update_fields=['status'])
@@ -31,35 +31,18 @@ def is_session_expired(session: ChatSession) -> bool:
     return elapsed_time > timeout_duration
 
 
-def end_session_helper(session: ChatSession) -> dict:
+def _finalize_session_inline(session: ChatSession) -> tuple:
     """
-    Shared helper to end a tutoring session, generate insights, and update progress.
-    Used by both manual end endpoint and automatic timeout logic.
+    Generate insights and apply XP inside the request.
+    Fallback for when the finalize_session task cannot be enqueued.
     
-    Args:
-        session: ChatSession instance to end
-        
     Returns:
-        dict with keys: already_ended, insights_generated, insight_status, total_messages
+        tuple: (insights_generated, insight_status)
     """
-    # Check if session is already inactive (idempotent)
-    if not session.is_active:
-        logger.info(f"Session {session.id} already ended, returning cached status")
-        return {
-            "already_ended": True,
-            "insights_generated": False,
-            "insight_status": "already_completed",
-            "total_messages": session.messages.count()
-        }
-    
-    # Mark session as inactive
-    session.is_active = False
-    session.save()
-    
     # Generate insights
     try:
         from api.insight_generator import generate_insights_for_session
-        insight = generate_insights_for_session(str(session.id))
+        insight = generate_insights_for_session(session)
         insights_generated = insight is not None
         insight_status = insight.status if insight else 'failed'
     except Exception as e:
@@ -79,6 +62,46 @@ def end_session_helper(session: ChatSession) -> dict:
         except Exception:
             pass
     
+    return insights_generated, insight_status
+
+
+def end_session_helper(session: ChatSession) -> dict:
+    """
+    Shared helper to end a tutoring session, generate insights, and update progress.
+    Used by the manual end endpoint, automatic timeout logic and question completion.
+    Insights and XP are handed to the finalize_session Celery task, so the
+    insight status is 'pending' unless the task could not be enqueued.
+    
+    Args:
+        session: ChatSession instance to end
+        
+    Returns:
+        dict with keys: already_ended, insights_generated, insight_status, total_messages
+    """
+    # Check if session is already inactive (idempotent)
+    if not session.is_active:
+        logger.info(f"Session {session.id} already ended, returning cached status")
+        return {
+            "already_ended": True,
+            "insights_generated": False,
+            "insight_status": "already_completed",
+            "total_messages": session.messages.count()
+        }
+    
+    # Mark session as inactive
+    session.is_active = False
+    session.save(update_fields=['is_active', 'updated_at'])
+    
+    # Generate insights and apply XP in the background (retried on transient LLM errors)
+    try:
+        from ..tasks import finalize_session
+        finalize_session.delay(str(session.id))
+        insights_generated = False
+        insight_status = 'pending'
+    except Exception as celery_error:
+        sentry_sdk.capture_message("Celery enqueue failed, finalizing session synchronously", level="warning", extras={"error": str(celery_error), "session_id": str(session.id)})
+        insights_generated, insight_status = _finalize_session_inline(session)
+    
     return {
         "already_ended": False,
         "insights_generated": insights_generated,
@@ -155,7 +178,7 @@ class TutoringSessionAnswerView(APIView):
         try:
             user = request.user
             try:
-                session = ChatSession.objects.get(id=session_id, user=user, is_active=True)
+                session = ChatSession.objects.select_related('user').get(id=session_id, user=user, is_active=True)
             except ChatSession.DoesNotExist:
                 return Response({"error": "Tutoring session not found or inactive"}, status=404)
             
@@ -185,6 +208,9 @@ class TutoringSessionAnswerView(APIView):
 
             response_data = {"session_id": str(session.id), "response_time_ms": response_time_ms}
             if result.get('session_complete'):
+                # All questions answered: end the session and finalize it in the background
+                end_result = end_session_helper(session)
+                response_data["insight_status"] = end_result["insight_status"]
                 response_data["finished"] = True
                 response_data["message"] = "Congratulations! You've completed all questions. Great work! 🎉"
                 if result.get('evaluation'):
@@ -228,7 +254,7 @@ class TutoringSessionAnswerView(APIView):
                 eval_result = result['evaluation']
                 response_data["evaluation"] = {"score": eval_result.score, "xp": eval_result.xp, "correct": eval_result.correct, "explanation": eval_result.explanation, "followup_action": eval_result.followup_action}
 
-            session.save()
+            session.save(update_fields=['updated_at'])
             return Response(response_data)
         except Exception as e:
             sentry_sdk.capture_exception(e, extras={"component": "tutoring", "view": "TutoringSessionAnswerView", "user_id": str(request.user.id) if request.user else None, "session_id": session_id})
@@ -335,7 +361,7 @@ class SessionInsightsView(APIView):
             except SessionInsight.DoesNotExist:
                 try:
                     from api.insight_generator import generate_insights_for_session
-                    insight = generate_insights_for_session(str(session.id))
+                    insight = generate_insights_for_session(session)
                     if not insight:
                         return Response({"message": "Not enough data to generate insights yet", "reason": "At least 2 question-answer pairs are needed for analysis", "session_id": str(session.id)}, status=202)
                 except Exception as e:
@@ -0,0 +1,43 @@
+"""
+Shared pytest setup and fixtures for the backend test modules.
+
+Django is configured here once per (xdist worker) process, so individual test
+modules need no sys.path / django.setup() preamble.
+"""
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import django
+import pytest
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hellotutor.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+
+# PBKDF2 makes every create_user() cost ~100ms; tests don't need real hashing
+settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+@pytest.fixture
+def mocked_rag_stack(monkeypatch):
+    """
+    Patch the external RAG dependencies used by api.rag_query.
+
+    Yields a namespace with `embed` (embedding client), `pinecone` (index) and
+    `gemini` (LLM client) mocks; tests only set the return values they need.
+    Embeddings and LLM availability are preconfigured.
+    """
+    embed = MagicMock()
+    embed.get_embeddings.return_value = [[0.1, 0.2, 0.3]]
+    index = MagicMock()
+    gemini = MagicMock()
+    gemini.is_available.return_value = True
+
+    monkeypatch.setattr('api.rag_query.get_tenant_tag', lambda user_id: 'test_tenant')
+    monkeypatch.setattr('api.rag_query.get_embedding_client', lambda: embed)
+    monkeypatch.setattr('api.rag_query.initialize_pinecone', lambda: index)
+    monkeypatch.setattr('api.rag_query.gemini_client', gemini)
+
+    yield SimpleNamespace(embed=embed, pinecone=index, gemini=gemini)
@@ -10,17 +10,97 @@ Key Features:
 - Exponential backoff retry mechanism
 - Task result tracking
 - Worker concurrency configuration
+- Dedicated 'insights' queue for I/O-bound session finalization
 """
 
 import os
-from celery import Celery
+import requests
+import redis
+from celery import Celery, Task
 from celery.schedules import crontab
+from urllib3.exceptions import MaxRetryError, ProtocolError
+
+# Transient errors worth retrying (network, broker, LLM/Pinecone availability).
+# Programming errors (AttributeError, KeyError, ...) are deliberately excluded
+# so a defective deploy fails fast and surfaces in Sentry instead of burning
+# the whole backoff schedule. HTTP-style errors carrying a 4xx status are
+# filtered out again by is_transient().
+TRANSIENT_EXCEPTIONS = (
+    ConnectionError,
+    TimeoutError,
+    requests.exceptions.RequestException,
+    redis.exceptions.ConnectionError,
+    ProtocolError,
+    MaxRetryError,
+)
+
+try:
+    from google.api_core import exceptions as google_exceptions
+    TRANSIENT_EXCEPTIONS += (
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+    )
+except ImportError:
+    pass
+
+try:
+    # ServiceException (5xx) subclasses PineconeApiException; other statuses
+    # are sorted out by is_transient()
+    from pinecone.exceptions import PineconeApiException, ServiceException
+    TRANSIENT_EXCEPTIONS += (
+        PineconeApiException,
+        ServiceException,
+    )
+except ImportError:
+    pass
+
+# Client errors that still deserve a retry: request timeout and rate limiting
+RETRYABLE_CLIENT_STATUSES = frozenset({408, 429})
+
+
+def _status_code(exc):
+    """HTTP status carried by a requests or Pinecone exception, if any"""
+    response = getattr(exc, 'response', None)
+    status = getattr(response, 'status_code', None)
+    if status is None:
+        # Pinecone >= 6 uses status_code, older clients status
+        status = getattr(exc, 'status_code', None) or getattr(exc, 'status', None)
+    return status if isinstance(status, int) else None
+
+
+def is_client_error(exc):
+    """Whether exc carries a 4xx status that will fail the same way on retry"""
+    status = _status_code(exc)
+    return status is not None and 400 <= status < 500 and status not in RETRYABLE_CLIENT_STATUSES
+
+
+def is_transient(exc):
+    """
+    Whether a task that failed with exc should be retried.
+    
+    4xx responses (bad request, auth, not found) are permanent even though
+    their exception types are in TRANSIENT_EXCEPTIONS.
+    """
+    return isinstance(exc, TRANSIENT_EXCEPTIONS) and not is_client_error(exc)
+
+
+class TransientRetryTask(Task):
+    """
+    Default task base: autoretry_for can only match exception types, so
+    retries for 4xx client errors are refused here and the task fails at once.
+    """
+
+    def retry(self, args=None, kwargs=None, exc=None, *retry_args, **options):
+        if exc is not None and is_client_error(exc):
+            raise exc
+        return super().retry(args, kwargs, exc, *retry_args, **options)
+
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hellotutor.settings')
 
 # Create Celery app instance
-app = Celery('hellotutor')
+app = Celery('hellotutor', task_cls=TransientRetryTask)
 
 # Load configuration from Django settings with 'CELERY_' prefix
 app.config_from_object('django.conf:settings', namespace='CELERY')
@@ -51,6 +131,15 @@ app.conf.update(
     result_extended=True,  # Store additional task metadata
     result_expires=3600,  # Results expire after 1 hour
     
+    # Task Routing
+    # finalize_session is enqueued by end_session_helper for every ended session.
+    # Insight generation is almost entirely I/O (Gemini HTTPS + DB), so it gets
+    # its own queue served by a threads-pool worker (see start_celery_workers.sh)
+    task_routes={
+        'api.tasks.finalize_session': {'queue': 'insights'},
+        'api.tasks.regenerate_session_insights': {'queue': 'insights'},
+    },
+    
     # Worker Configuration
     worker_prefetch_multiplier=4,  # How many tasks to prefetch per worker
     worker_max_tasks_per_child=1000,  # Restart worker after 1000 tasks (memory cleanup)
@@ -60,7 +149,7 @@ app.conf.update(
     task_time_limit=2400,  # 40 minutes hard limit (kills process)
     
     # Retry Configuration
-    task_autoretry_for=(Exception,),  # Retry on any exception
+    task_autoretry_for=TRANSIENT_EXCEPTIONS,  # Retry on transient errors only
     task_retry_kwargs={
         'max_retries': 3,
         'countdown': 5,  # Initial delay before first retry (seconds)
@@ -175,6 +175,18 @@ LLM_API_KEY = os.environ.get("LLM_API_KEY")
 # Embedding API Key (for Gemini Embedding-001)
 EMBEDDING_API_KEY = os.environ.get("EMBEDDING_API_KEY")
 
+# Embedding Cache Configuration
+# Persistent embedding cache directory (requires diskcache); disabled when unset
+EMBEDDING_CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR")
+# Cosine similarity at which query_rag reuses a cached answer for a near-identical
+# query from the same user; disabled when unset
+RAG_SEMANTIC_CACHE_THRESHOLD = (
+    float(os.environ["RAG_SEMANTIC_CACHE_THRESHOLD"]) if os.environ.get("RAG_SEMANTIC_CACHE_THRESHOLD") else None
+)
+# Worker processes for spaCy sentence splitting during ingestion; 1 keeps it
+# in-process (each extra worker reloads the model, so opt in for big documents)
+RAG_SPACY_N_PROCESS = int(os.environ.get("RAG_SPACY_N_PROCESS", "1"))
+
 # Google OAuth Configuration
 GOOGLE_OAUTH_CLIENT_ID = os.environ.get("GOOGLE_OAUTH_CLIENT_ID")
 GOOGLE_OAUTH_CLIENT_SECRET = os.environ.get("GOOGLE_OAUTH_CLIENT_SECRET")
@@ -230,6 +242,19 @@ CELERY_RESULT_EXPIRES = 3600  # 1 hour
 CELERY_TASK_SOFT_TIME_LIMIT = 1800  # 30 minutes
 CELERY_TASK_TIME_LIMIT = 2400  # 40 minutes
 
+# Cache Configuration
+# Uses Redis when CACHE_REDIS_URL is set, otherwise Django's per-process
+# local-memory cache. The semantic-cache tenant versions bumped by the Celery
+# ingest/delete tasks live here, so multi-process deployments need Redis.
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL")
+if CACHE_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+        }
+    }
+
 # Session Timeout Configuration
 # Tutoring sessions automatically end after this duration (in minutes)
 SESSION_TIMEOUT_MINS = int(os.environ.get("SESSION_TIMEOUT_MINS", "15"))
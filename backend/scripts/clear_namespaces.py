@@ -19,12 +19,15 @@ This script:
 Be careful: deletion is irreversible. This script is intended for test
 indexes and cleanup.
 """
+import io
 import os
 import sys
 import json
 import time
 import argparse
-import traceback
+import logging
+from operator import attrgetter, itemgetter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Setup Django settings so we can read env/config
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "hellotutor.settings")
@@ -44,6 +47,15 @@ except Exception as e:
 from django.conf import settings
 from pinecone import Pinecone
 
+logger = logging.getLogger(__name__)
+
+# orjson is optional; it serializes large stats snapshots much faster
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 
 def describe_index(pc, index_name):
     try:
@@ -57,15 +69,84 @@ def describe_index(pc, index_name):
 
 def save_backup(stats, path="pinecone_stats_backup.json"):
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(stats, f, indent=2)
+        if HAS_ORJSON:
+            with open(path, "wb") as f:
+                f.write(orjson.dumps(stats, option=orjson.OPT_INDENT_2))
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(stats, f, indent=2)
         print(f"Saved backup stats to {path}")
     except Exception as e:
         print(f"Failed to save backup: {e}")
 
 
-def delete_namespace(index, ns):
-    """Attempt to delete all vectors in a namespace with safe fallbacks."""
+def _extract_count(info):
+    """Extract a vector count from the different namespace info shapes."""
+    # dict-like
+    if isinstance(info, dict):
+        return info.get("vector_count") or info.get("total_vector_count") or None
+    # object with attributes
+    for attr in ("vector_count", "count", "total_vector_count", "total_count"):
+        if hasattr(info, attr):
+            try:
+                return int(getattr(info, attr))
+            except Exception:
+                return None
+    # fallback
+    return None
+
+
+def _namespace_map(stats):
+    """Return the namespace -> info mapping from dict- or object-shaped stats."""
+    if isinstance(stats, dict):
+        return stats.get("namespaces", {})
+    # Object-like access (NamespaceSummary or similar)
+    return getattr(stats, "namespaces", None) or {}
+
+
+def _namespace_counts(ns_map):
+    """
+    Return [(namespace, vector_count)] for every namespace.
+
+    The getter is chosen once from the first entry's shape; entries that
+    don't fit it fall back to the generic _extract_count probe.
+    """
+    items = list(ns_map.items())
+    if not items:
+        return []
+    getter = itemgetter("vector_count") if isinstance(items[0][1], dict) else attrgetter("vector_count")
+    try:
+        return [(ns, getter(info)) for ns, info in items]
+    except (KeyError, AttributeError, TypeError):
+        return [(ns, _extract_count(info)) for ns, info in items]
+
+
+def wait_for_convergence(pc, index_name, targets, max_wait=10, interval=0.25):
+    """
+    Poll index stats until every target namespace reports no vectors.
+
+    Pinecone is eventually consistent, so deletes may take a moment to show
+    up in describe_index_stats. Returns the last stats seen.
+    """
+    deadline = time.monotonic() + max_wait
+    while True:
+        stats = describe_index(pc, index_name)
+        if stats is not None:
+            ns_map = _namespace_map(stats)
+            if all(_extract_count(ns_map.get(t, {})) in (0, None) for t in targets):
+                return stats
+        if time.monotonic() >= deadline:
+            print(f"Warning: namespaces still reporting vectors after {max_wait}s")
+            return stats
+        time.sleep(interval)
+
+
+def delete_namespace(index, ns, verbose=False):
+    """
+    Attempt to delete all vectors in a namespace with safe fallbacks.
+
+    Full tracebacks for unexpected errors are only logged when verbose.
+    """
     print(f"Attempting to clear namespace: {ns}")
     try:
         # Preferred direct method if supported
@@ -100,8 +181,10 @@ def delete_namespace(index, ns):
             return False
 
     except Exception as e:
-        print(f" - ERROR clearing namespace {ns}: {e}")
-        traceback.print_exc()
+        if verbose:
+            logger.exception(" - ERROR clearing namespace %s", ns)
+        else:
+            logger.error(" - ERROR clearing namespace %s: %r", ns, e)
         return False
 
 
@@ -109,7 +192,9 @@ def main():
     parser = argparse.ArgumentParser(description="Clear Pinecone namespaces")
     parser.add_argument("--delete", action="store_true", help="Actually delete vectors in found namespaces")
     parser.add_argument("--index", type=str, default=None, help="Override index name (optional)")
+    parser.add_argument("--verbose", action="store_true", help="Log full tracebacks for failed deletions")
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
 
     api_key = getattr(settings, "PINECONE_API_KEY", None)
     index_name = args.index or getattr(settings, "PINECONE_INDEX", None)
@@ -133,38 +218,12 @@ def main():
     namespaces = []
     serializable_stats = {"namespaces": {}}
 
-    # Helper to extract vector count from different info shapes
-    def _extract_count(info):
-        # dict-like
-        if isinstance(info, dict):
-            return info.get("vector_count") or info.get("total_vector_count") or None
-        # object with attributes
-        for attr in ("vector_count", "count", "total_vector_count", "total_count"):
-            if hasattr(info, attr):
-                try:
-                    return int(getattr(info, attr))
-                except Exception:
-                    return None
-        # fallback
-        return None
-
-    if isinstance(stats, dict):
-        ns_map = stats.get("namespaces", {})
-        for ns, info in ns_map.items():
-            count = _extract_count(info)
-            namespaces.append((ns, count))
-            serializable_stats["namespaces"][ns] = {"vector_count": count}
-    else:
-        # Try object-like access (NamespaceSummary or similar)
-        ns_map = getattr(stats, "namespaces", None) or {}
-        try:
-            for ns, info in ns_map.items():
-                count = _extract_count(info)
-                namespaces.append((ns, count))
-                serializable_stats["namespaces"][ns] = {"vector_count": count}
-        except Exception:
-            # Last resort: set serializable to string
-            serializable_stats = {"raw_stats": str(stats)}
+    try:
+        namespaces = _namespace_counts(_namespace_map(stats))
+        serializable_stats["namespaces"] = {ns: {"vector_count": count} for ns, count in namespaces}
+    except Exception:
+        # Last resort: set serializable to string
+        serializable_stats = {"raw_stats": str(stats)}
 
     # Save a clean JSON-serializable backup
     save_backup(serializable_stats)
@@ -172,9 +231,11 @@ def main():
     if not namespaces:
         print("No namespaces found in index (index may be empty).")
     else:
-        print("Found namespaces and counts:")
+        buf = io.StringIO()
+        buf.write("Found namespaces and counts:\n")
         for ns, count in namespaces:
-            print(f" - {ns}: vector_count={count}")
+            buf.write(f" - {ns}: vector_count={count}\n")
+        sys.stdout.write(buf.getvalue())
 
     if not args.delete:
         print("\nDry run complete. No deletion performed. Rerun with --delete to remove data.")
@@ -186,20 +247,21 @@ def main():
         print("Abort: Deletion cancelled by user.")
         sys.exit(0)
 
-    # Perform deletion per-namespace
+    # Perform deletion per-namespace; each delete is an independent HTTP call
     index = pc.Index(index_name)
     results = {}
-    for ns, count in namespaces:
-        ok = delete_namespace(index, ns)
-        results[ns] = {"requested_count": count, "deleted": ok}
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        futures = {ex.submit(delete_namespace, index, ns, args.verbose): (ns, count) for ns, count in namespaces}
+        for fut in as_completed(futures):
+            ns, count = futures[fut]
+            results[ns] = {"requested_count": count, "deleted": fut.result()}
 
     print("\nDeletion summary:")
     for ns, info in results.items():
         print(f" - {ns}: requested_count={info['requested_count']} deleted={info['deleted']}")
 
-    # Show final stats
-    time.sleep(1)
-    final_stats = describe_index(pc, index_name)
+    # Show final stats once the deletes are visible
+    final_stats = wait_for_convergence(pc, index_name, [ns for ns, _ in namespaces])
     print("\nFinal index stats:")
     print(final_stats)
 
@@ -57,11 +57,20 @@ try {
     Write-Host "Worker 4 failed to start: $($_.Exception.Message)" -ForegroundColor Red
     $worker4 = $null
 }
+try {
+    # Insights queue receives finalize_session for every ended session; it is I/O bound,
+    # so threads overlap the Gemini calls, and each one holds a DB connection
+    $insightsWorker = Start-Process -FilePath "python" -ArgumentList "-m celery -A hellotutor worker --loglevel=info -Q insights -P threads --concurrency=8 -n insights@%h" -PassThru -WindowStyle Normal -ErrorAction Stop
+} catch {
+    Write-Host "Insights worker failed to start: $($_.Exception.Message)" -ForegroundColor Red
+    $insightsWorker = $null
+}
 
 if ($worker1) { Write-Host "Worker 1 started (PID: $($worker1.Id))" -ForegroundColor Green } else { Write-Host "Worker 1 not running" -ForegroundColor Yellow }
 if ($worker2) { Write-Host "Worker 2 started (PID: $($worker2.Id))" -ForegroundColor Green } else { Write-Host "Worker 2 not running" -ForegroundColor Yellow }
 if ($worker3) { Write-Host "Worker 3 started (PID: $($worker3.Id))" -ForegroundColor Green } else { Write-Host "Worker 3 not running" -ForegroundColor Yellow }
 if ($worker4) { Write-Host "Worker 4 started (PID: $($worker4.Id))" -ForegroundColor Green } else { Write-Host "Worker 4 not running" -ForegroundColor Yellow }
+if ($insightsWorker) { Write-Host "Insights worker started (PID: $($insightsWorker.Id))" -ForegroundColor Green } else { Write-Host "Insights worker not running" -ForegroundColor Yellow }
 
 Write-Host "`nAll workers are running!" -ForegroundColor Green
 Write-Host "Monitor workers: http://localhost:5555 (if Flower is installed)" -ForegroundColor Cyan
@@ -73,7 +82,7 @@ try {
         Start-Sleep -Seconds 10
         
         # Check if workers are still running
-        if ($worker1.HasExited -or $worker2.HasExited -or $worker3.HasExited -or $worker4.HasExited) {
+        if ($worker1.HasExited -or $worker2.HasExited -or $worker3.HasExited -or $worker4.HasExited -or $insightsWorker.HasExited) {
             Write-Host "`nWARNING: One or more workers have stopped!" -ForegroundColor Red
             break
         }
@@ -85,5 +94,6 @@ finally {
     if ($worker2) { Stop-Process -Id $worker2.Id -Force -ErrorAction SilentlyContinue }
     if ($worker3) { Stop-Process -Id $worker3.Id -Force -ErrorAction SilentlyContinue }
     if ($worker4) { Stop-Process -Id $worker4.Id -Force -ErrorAction SilentlyContinue }
+    if ($insightsWorker) { Stop-Process -Id $insightsWorker.Id -Force -ErrorAction SilentlyContinue }
     Write-Host "Workers stopped." -ForegroundColor Green
 }
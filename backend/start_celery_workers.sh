@@ -1,5 +1,5 @@
 #!/bin/bash
-# Bash script to start 4 Celery workers on Linux/Mac
+# Bash script to start 4 Celery workers plus an insights worker on Linux/Mac
 # Usage: ./start_celery_workers.sh
 
 echo "Starting InzightedG Celery Workers..."
@@ -45,6 +45,17 @@ celery -A hellotutor worker --loglevel=info --concurrency=4 -n worker4@%h &
 WORKER4_PID=$!
 echo "✓ Worker 4 started (PID: $WORKER4_PID)"
 
+# Insights worker: consumes finalize_session, enqueued whenever a tutoring
+# session ends. Session finalization is I/O bound (Gemini REST + DB), so a
+# threads pool overlaps the calls in one process. Each thread holds its own
+# Django DB connection, so concurrency is also the Postgres connection count;
+# raise CELERY_INSIGHTS_CONCURRENCY only within the database's limits.
+INSIGHTS_POOL="${CELERY_INSIGHTS_POOL:-threads}"
+INSIGHTS_CONCURRENCY="${CELERY_INSIGHTS_CONCURRENCY:-8}"
+celery -A hellotutor worker --loglevel=info -Q insights -P "$INSIGHTS_POOL" --concurrency="$INSIGHTS_CONCURRENCY" -n insights@%h &
+INSIGHTS_PID=$!
+echo "✓ Insights worker started (PID: $INSIGHTS_PID, pool: $INSIGHTS_POOL x $INSIGHTS_CONCURRENCY)"
+
 echo ""
 echo "All workers are running!"
 echo "Monitor workers: http://localhost:5555 (if Flower is installed)"
@@ -52,7 +63,7 @@ echo ""
 echo "To stop workers, run: ./stop_celery_workers.sh"
 
 # Trap Ctrl+C and stop all workers
-trap "echo ''; echo 'Stopping workers...'; kill $WORKER1_PID $WORKER2_PID $WORKER3_PID $WORKER4_PID 2>/dev/null; echo 'Workers stopped.'; exit 0" INT TERM
+trap "echo ''; echo 'Stopping workers...'; kill $WORKER1_PID $WORKER2_PID $WORKER3_PID $WORKER4_PID $INSIGHTS_PID 2>/dev/null; echo 'Workers stopped.'; exit 0" INT TERM
 
 # Wait for any worker to exit
 wait
@@ -10,17 +10,15 @@ Usage:
 
 import os
 import sys
-import django
+import argparse
 
-# Setup Django environment
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hellotutor.settings')
-django.setup()
 
-from api.tasks import test_celery, process_document
-from api.models import Document, User
-from celery.result import AsyncResult
-import time
+def setup_django():
+    """Setup Django environment (deferred until after argument parsing)"""
+    import django
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hellotutor.settings')
+    django.setup()
 
 
 def print_header(text):
@@ -50,20 +48,18 @@ def test_celery_connection():
     print_header("Test 1: Celery Connection")
     
     try:
-        print_info("Sending test task to Celery...")
-        result = test_celery.delay()
-        
-        print_info(f"Task ID: {result.id}")
-        print_info("Waiting for result (timeout: 10s)...")
+        from celery import current_app
         
-        task_result = result.get(timeout=10)
+        # Broker-only round trip; the result backend is exercised by Test 4
+        print_info("Pinging Celery workers (timeout: 1s)...")
+        pong = current_app.control.ping(timeout=1)
         
-        if task_result and task_result.get('status') == 'success':
+        if pong:
             print_success("Celery connection test PASSED")
-            print_info(f"Message: {task_result.get('message')}")
+            print_info(f"Replies: {', '.join(name for reply in pong for name in reply)}")
             return True
         else:
-            print_error("Unexpected result from test task")
+            print_error("No workers replied to ping")
             return False
             
     except Exception as e:
@@ -82,15 +78,13 @@ def test_task_registration():
     try:
         from celery import current_app
         
-        registered_tasks = list(current_app.tasks.keys())
-        
-        if 'api.tasks.process_document' in registered_tasks:
+        if 'api.tasks.process_document' in current_app.tasks:
             print_success("process_document task is registered")
             return True
         else:
             print_error("process_document task NOT registered")
             print_info("Registered tasks:")
-            for task in registered_tasks:
+            for task in current_app.tasks:
                 if task.startswith('api.'):
                     print_info(f"  - {task}")
             return False
@@ -100,26 +94,34 @@ def test_task_registration():
         return False
 
 
-def test_mock_document_processing():
-    """Test 3: Mock document processing task"""
-    print_header("Test 3: Mock Document Processing")
+def enqueue_mock_document_processing():
+    """
+    Test 3 (part 1): enqueue a document processing task.
+
+    Returns (ok, result). result is None when there is nothing to process, so
+    the task can run on the workers while the remaining tests execute.
+    """
+    print_header("Test 3: Mock Document Processing (enqueue)")
     
     try:
+        from api.models import Document, User
+        from api.tasks import process_document
+        
         # Get a test user
-        user = User.objects.first()
+        user = User.objects.only('id', 'email').first()
         if not user:
             print_error("No users found in database. Please create a user first.")
-            return False
+            return False, None
         
         print_info(f"Using test user: {user.email}")
         
         # Check if there's a document to test with
-        test_doc = Document.objects.filter(user=user, status='completed').first()
+        test_doc = Document.objects.filter(user=user, status='completed').only('id', 's3_key', 'filename').first()
         
         if not test_doc:
             print_info("No completed documents found. Skipping actual task execution.")
             print_info("This test requires an uploaded document to fully verify.")
-            return True
+            return True, None
         
         print_info(f"Found test document: {test_doc.filename}")
         print_info("Testing idempotency (document already completed)...")
@@ -132,7 +134,27 @@ def test_mock_document_processing():
         )
         
         print_info(f"Task ID: {result.id}")
-        print_info("Waiting for result (timeout: 60s)...")
+        return True, result
+            
+    except Exception as e:
+        print_error(f"Mock document processing FAILED: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False, None
+
+
+def test_mock_document_processing(pending):
+    """Test 3 (part 2): wait for the enqueued document processing task"""
+    print_header("Test 3: Mock Document Processing")
+    
+    ok, result = pending
+    if not ok:
+        return False
+    if result is None:
+        return True
+    
+    try:
+        print_info(f"Waiting for task {result.id} (timeout: 60s)...")
         
         task_result = result.get(timeout=60)
         
@@ -152,31 +174,28 @@ def test_mock_document_processing():
         return False
 
 
-def test_task_status_tracking():
+def test_task_status_tracking(result):
     """Test 4: Task status tracking"""
     print_header("Test 4: Task Status Tracking")
     
     try:
-        print_info("Sending test task...")
-        result = test_celery.delay()
+        from celery.result import AsyncResult
+        
         task_id = result.id
         
         print_info(f"Task ID: {task_id}")
         
-        # Check various states
-        states_checked = []
-        for i in range(10):
-            task_result = AsyncResult(task_id)
-            state = task_result.state
-            
-            if state not in states_checked:
-                print_info(f"Task state: {state}")
-                states_checked.append(state)
-            
-            if state in ['SUCCESS', 'FAILURE']:
-                break
-                
-            time.sleep(0.5)
+        # Log the initial state, then block on the result backend instead
+        # of polling at a fixed interval
+        states_checked = [AsyncResult(task_id).state]
+        print_info(f"Task state: {states_checked[0]}")
+        
+        result.get(timeout=5, propagate=False)
+        
+        state = AsyncResult(task_id).state
+        if state not in states_checked:
+            print_info(f"Task state: {state}")
+            states_checked.append(state)
         
         if 'SUCCESS' in states_checked:
             print_success("Task status tracking works correctly")
@@ -233,12 +252,28 @@ def run_all_tests():
     
     results = []
     
+    # Dispatch independent tasks up front so workers run them while we wait;
+    # Test 4 consumes the test_celery result
+    try:
+        from api.tasks import test_celery
+        
+        print_info("Sending test task to Celery...")
+        test_result = test_celery.delay()
+    except Exception as e:
+        print_error(f"Could not enqueue test task: {str(e)}")
+        print_info("Make sure Redis is running (redis-cli ping)")
+        return False
+    
     # Run tests
     results.append(("Celery Connection", test_celery_connection()))
-    results.append(("Task Registration", test_task_registration()))
+    registered = test_task_registration()
+    results.append(("Task Registration", registered))
+    pending_document = enqueue_mock_document_processing() if registered else None
     results.append(("Worker Count", test_worker_count()))
-    results.append(("Task Status Tracking", test_task_status_tracking()))
-    results.append(("Mock Document Processing", test_mock_document_processing()))
+    results.append(("Task Status Tracking", test_task_status_tracking(test_result)))
+    if pending_document is None:
+        pending_document = enqueue_mock_document_processing()
+    results.append(("Mock Document Processing", test_mock_document_processing(pending_document)))
     
     # Print summary
     print_header("Test Summary")
@@ -262,7 +297,12 @@ def run_all_tests():
 
 
 if __name__ == '__main__':
+    argparse.ArgumentParser(
+        description="Verify the Celery setup (Redis broker, workers and document tasks)"
+    ).parse_args()
+    
     try:
+        setup_django()
         success = run_all_tests()
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
@@ -1,21 +1,22 @@
 """
-Test script to verify dynamic language implementation.
+Tests for the dynamic language implementation.
 
-This script demonstrates how the language preference flows from User → Session → Agent → Prompts.
+Language preference flows from User → Session → Agent → Prompts.
 """
 
-import os
-import sys
-import django
+if __name__ == '__main__':
+    # Running the file directly delegates to pytest (conftest.py sets up Django)
+    import sys
+    import pytest
+    sys.exit(pytest.main([__file__]))
+
+
+import inspect
+from unittest.mock import patch
 
-# Setup Django environment
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hellotutor.settings')
-django.setup()
+from django.test import TestCase
 
-from api.models import User, ChatSession, Document
-from api.agent_flow import TutorAgent
-from api.gemini_client import gemini_client
+from api.models import User, ChatSession
 from api.tanglish_prompts import (
     get_intent_classifier_system_prompt,
     get_question_generator_system_prompt,
@@ -26,223 +27,65 @@ from api.tanglish_prompts import (
 
 def test_prompt_functions():
     """Test that prompt functions accept and use language parameter."""
-    print("=" * 80)
-    print("TEST 1: Prompt Functions with Dynamic Language")
-    print("=" * 80)
-    
-    # Test intent classifier with different languages
-    print("\n1. Intent Classifier Prompts:")
-    print("-" * 80)
-    
-    tanglish_prompt = get_intent_classifier_system_prompt("tanglish")
-    print(f"Tanglish prompt (first 200 chars):\n{tanglish_prompt[:200]}...\n")
-    
-    english_prompt = get_intent_classifier_system_prompt("english")
-    print(f"English prompt (first 200 chars):\n{english_prompt[:200]}...\n")
-    
-    hindi_prompt = get_intent_classifier_system_prompt("hindi")
-    print(f"Hindi prompt (first 200 chars):\n{hindi_prompt[:200]}...\n")
-    
-    # Test question generator
-    print("\n2. Question Generator Prompts:")
-    print("-" * 80)
-    
-    tanglish_qgen = get_question_generator_system_prompt("tanglish")
-    print(f"Tanglish includes style rules: {'transliteration' in tanglish_qgen.lower()}")
-    
-    english_qgen = get_question_generator_system_prompt("english")
-    print(f"English includes style rules: {'transliteration' in english_qgen.lower()}")
-    
-    print("\n✅ Prompt functions support dynamic language\n")
-
-
-def test_agent_language_property():
+    for language in ("tanglish", "english", "hindi", "tanglish"):
+        assert language in get_intent_classifier_system_prompt(language).lower()
+    # Prompts are memoized per language
+    assert get_intent_classifier_system_prompt.cache_info().hits > 0
+
+    # Only the Tanglish question generator carries transliteration rules
+    assert 'transliterated' in get_question_generator_system_prompt("tanglish").lower()
+    assert 'transliterated' not in get_question_generator_system_prompt("english").lower()
+
+
+@patch('api.agent_flow.get_tenant_tag', return_value='tenant_language')
+class LanguageTests(TestCase):
     """Test that TutorAgent reads user's preferred language."""
-    print("=" * 80)
-    print("TEST 2: TutorAgent Language Property")
-    print("=" * 80)
-    
-    try:
-        # Get or create test user
-        user, created = User.objects.get_or_create(
+
+    @classmethod
+    def setUpTestData(cls):
+        # Created once per class; each test runs in a rolled-back transaction
+        cls.user = User.objects.create_user(
             username='test_language_user',
-            defaults={'email': 'test@language.com'}
+            email='test@language.com',
+            password='testpass123'
         )
-        
-        # Test 1: User with preferred_language set to 'english'
-        user.preferred_language = 'english'
-        user.save()
-        
-        session_english = ChatSession.objects.create(user=user, title="English Test Session")
-        agent_english = TutorAgent(session_english)
-        
-        print(f"\nUser preferred_language: {user.preferred_language}")
-        print(f"Agent language: {agent_english.language}")
-        assert agent_english.language == 'english', "Agent should use user's preferred language"
-        print("✅ Agent correctly reads user.preferred_language = 'english'\n")
-        
-        # Test 2: User with preferred_language set to 'tanglish'
-        user.preferred_language = 'tanglish'
-        user.save()
-        
-        session_tanglish = ChatSession.objects.create(user=user, title="Tanglish Test Session")
-        agent_tanglish = TutorAgent(session_tanglish)
-        
-        print(f"User preferred_language: {user.preferred_language}")
-        print(f"Agent language: {agent_tanglish.language}")
-        assert agent_tanglish.language == 'tanglish', "Agent should use user's preferred language"
-        print("✅ Agent correctly reads user.preferred_language = 'tanglish'\n")
-        
-        # Test 3: User without preferred_language (fallback to session.language)
-        user.preferred_language = None
-        user.save()
-        
-        session_fallback = ChatSession.objects.create(user=user, title="Fallback Test", language='spanish')
-        agent_fallback = TutorAgent(session_fallback)
-        
-        print(f"User preferred_language: {user.preferred_language}")
-        print(f"Session language: {session_fallback.language}")
-        print(f"Agent language: {agent_fallback.language}")
-        assert agent_fallback.language == 'spanish', "Agent should fallback to session language"
-        print("✅ Agent correctly falls back to session.language = 'spanish'\n")
-        
-        # Cleanup
-        session_english.delete()
-        session_tanglish.delete()
-        session_fallback.delete()
-        user.delete()
-        
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+
+    def test_agent_language_property(self, mock_tenant_tag):
+        from api.agent_flow import TutorAgent
+
+        # (user preference, expected agent language); every session is created
+        # in Spanish so only the last case falls back to session.language
+        cases = [('english', 'english'), ('tanglish', 'tanglish'), ('', 'spanish')]
+        sessions = ChatSession.objects.bulk_create([
+            ChatSession(user=self.user, title=f"{expected} Test Session", language='spanish')
+            for _, expected in cases
+        ])
+
+        for (preference, expected), session in zip(cases, sessions):
+            with self.subTest(preference=preference):
+                self.user.preferred_language = preference
+                self.user.save(update_fields=['preferred_language'])
+                self.assertEqual(TutorAgent(session).language, expected)
 
 
 def test_gemini_client_methods():
     """Test that gemini_client methods accept language parameter."""
-    print("=" * 80)
-    print("TEST 3: Gemini Client Methods with Language Parameter")
-    print("=" * 80)
-    
-    # Test classify_intent signature
-    print("\n1. classify_intent(user_message, language='tanglish')")
-    print("   ✅ Method signature accepts language parameter")
-    
-    # Test generate_questions_structured signature
-    print("\n2. generate_questions_structured(context, total_questions=10, language='tanglish')")
-    print("   ✅ Method signature accepts language parameter")
-    
-    # Test evaluate_answer signature
-    print("\n3. evaluate_answer(context, expected_answer, student_answer, language='tanglish')")
-    print("   ✅ Method signature accepts language parameter")
-    
-    # Test generate_boostme_insights signature
-    print("\n4. generate_boostme_insights(qa_records, language='tanglish')")
-    print("   ✅ Method signature accepts language parameter")
-    
-    print("\n✅ All gemini_client methods support language parameter\n")
+    from api.gemini_client import gemini_client
+
+    for method in ('classify_intent', 'generate_questions_structured', 'evaluate_answer', 'generate_boostme_insights'):
+        params = inspect.signature(getattr(gemini_client, method)).parameters
+        assert 'language' in params, f"{method} should accept a language parameter"
 
 
 def test_build_prompt_functions():
     """Test prompt builder functions with different languages."""
-    print("=" * 80)
-    print("TEST 4: Prompt Builder Functions")
-    print("=" * 80)
-    
     context = "Python is a programming language"
     expected_answer = "It is easy to learn"
     student_answer = "Python romba easy to learn"
-    
-    # Test question generation prompt
-    print("\n1. Question Generation Prompt:")
-    print("-" * 80)
-    
-    tanglish_q_prompt = build_question_generation_prompt(context, 5, "tanglish")
-    print(f"Tanglish prompt length: {len(tanglish_q_prompt)} chars")
-    print(f"Contains 'tanglish': {('tanglish' in tanglish_q_prompt.lower())}")
-    
-    english_q_prompt = build_question_generation_prompt(context, 5, "english")
-    print(f"English prompt length: {len(english_q_prompt)} chars")
-    print(f"Contains 'english': {('english' in english_q_prompt.lower())}")
-    
-    # Test evaluation prompt
-    print("\n2. Evaluation Prompt:")
-    print("-" * 80)
-    
-    tanglish_eval = build_evaluation_prompt(context, expected_answer, student_answer, "tanglish")
-    print(f"Tanglish eval prompt length: {len(tanglish_eval)} chars")
-    print(f"Contains 'tanglish': {('tanglish' in tanglish_eval.lower())}")
-    
-    english_eval = build_evaluation_prompt(context, expected_answer, student_answer, "english")
-    print(f"English eval prompt length: {len(english_eval)} chars")
-    print(f"Contains 'english': {('english' in english_eval.lower())}")
-    
-    print("\n✅ Prompt builder functions correctly use language parameter\n")
-
-
-def print_summary():
-    """Print implementation summary."""
-    print("=" * 80)
-    print("IMPLEMENTATION SUMMARY")
-    print("=" * 80)
-    
-    print("""
-✅ Dynamic Language Implementation Complete
-
-LANGUAGE FLOW:
-User.preferred_language → ChatSession.language → TutorAgent.language → Prompts
-
-FILES MODIFIED:
-1. api/tanglish_prompts.py
-   - All prompt constants → functions with language parameter
-   - Conditional Tanglish-specific rules
-   
-2. api/gemini_client.py
-   - classify_intent(language="tanglish")
-   - generate_questions_structured(language="tanglish")
-   - evaluate_answer(language="tanglish")
-   - generate_boostme_insights(language="tanglish")
-   
-3. api/agent_flow.py
-   - Added self.language property in TutorAgent.__init__()
-   - All gemini_client calls pass language parameter
-   
-4. api/views/tutoring_views.py
-   - Session creation uses user.preferred_language
-   
-5. api/views/chat_views.py
-   - Session creation uses user.preferred_language
-
-USAGE:
-user.preferred_language = 'english'  # or 'tanglish', 'hindi', etc.
-# System automatically uses the language everywhere!
-
-BENEFITS:
-✓ Support unlimited languages (no code changes needed)
-✓ User-centric (respects preference automatically)
-✓ Backward compatible (defaults to 'tanglish')
-✓ Easy to add language-specific rules
-✓ Single source of truth for language
-
-See DYNAMIC_LANGUAGE_IMPLEMENTATION.md for full documentation.
-""")
 
+    # Each builder embeds a language-specific instruction
+    assert 'Use Tanglish phrasing' in build_question_generation_prompt(context, 5, "tanglish")
+    assert 'Use english phrasing' in build_question_generation_prompt(context, 5, "english")
 
-if __name__ == '__main__':
-    print("\n🚀 Testing Dynamic Language Implementation\n")
-    
-    try:
-        test_prompt_functions()
-        test_agent_language_property()
-        test_gemini_client_methods()
-        test_build_prompt_functions()
-        print_summary()
-        
-        print("\n" + "=" * 80)
-        print("✅ ALL TESTS PASSED - Dynamic Language Implementation Working!")
-        print("=" * 80 + "\n")
-        
-    except Exception as e:
-        print(f"\n❌ ERROR: {e}")
-        import traceback
-        traceback.print_exc()
+    assert 'explanation (tanglish)' in build_evaluation_prompt(context, expected_answer, student_answer, "tanglish")
+    assert 'explanation (english)' in build_evaluation_prompt(context, expected_answer, student_answer, "english")
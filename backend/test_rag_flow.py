@@ -4,25 +4,26 @@ Comprehensive RAG Flow Test Script
 Tests the complete pipeline from document ingestion to query response
 """
 
+import io
 import os
 import sys
 import django
-import tempfile
+import threading
+import time
 import uuid
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # Setup Django environment
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hellotutor.settings')
 django.setup()
 
 from api.rag_ingestion import ingest_document, initialize_pinecone
-from api.rag_query import query_rag
+from api.rag_query import query_rag, query_rag_batch
 from api.auth import get_tenant_tag
 from api.gemini_client import gemini_client
 
-def create_test_document():
-    """Create a test document with sample content"""
-    test_content = """
+# Sample content for the single-user ingestion and query tests
+ML_DOCUMENT = """
     Machine Learning and Artificial Intelligence
     
     Machine learning is a subset of artificial intelligence that focuses on the development of algorithms 
@@ -46,19 +47,26 @@ def create_test_document():
     
     The future of AI holds great promise for solving complex problems and improving human life.
     """
-    
-    # Create temporary file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8') as f:
-        f.write(test_content)
-        return f.name
+
+# Fixture documents for the cross-tenant isolation test
+USER1_DOCUMENT = "User 1's secret information about quantum computing and advanced algorithms."
+USER2_DOCUMENT = "User 2's confidential data about blockchain technology and cryptocurrency."
+
+# Last successful embedding probe; repeated runs within the TTL reuse it
+EMBEDDING_PROBE_TTL = 60
+_EMB_PROBE = {'ts': 0.0, 'ok': False}
 
 def test_embedding_api():
     """Test if embedding API is working"""
     print("🧪 Testing Embedding API...")
+    if _EMB_PROBE['ok'] and time.monotonic() - _EMB_PROBE['ts'] < EMBEDDING_PROBE_TTL:
+        print("✅ Embedding API works! (cached result from a probe in the last minute)")
+        return True
     try:
         test_texts = ["Hello world", "Machine learning is fascinating"]
         embeddings = gemini_client.get_embeddings(test_texts)
         print(f"✅ Embedding API works! Got {len(embeddings)} embeddings of dimension {len(embeddings[0])}")
+        _EMB_PROBE.update(ts=time.monotonic(), ok=True)
         return True
     except Exception as e:
         print(f"❌ Embedding API failed: {e}")
@@ -100,29 +108,22 @@ def test_tenant_isolation():
         print(f"❌ Tenant isolation failed: {e}")
         return False
 
-def test_document_ingestion():
+def test_document_ingestion(content):
     """Test document ingestion pipeline"""
     print("🧪 Testing Document Ingestion...")
     try:
-        # Create test document
-        test_file = create_test_document()
         test_user_id = f"test_user_{uuid.uuid4().hex[:8]}"
         
-        print(f"Created test document: {test_file}")
+        print(f"Test document: {len(content)} characters (in memory)")
         print(f"Test user ID: {test_user_id}")
         
-        # Ingest document
-        ingest_document(test_file, test_user_id)
-        
-        # Cleanup
-        os.unlink(test_file)
+        # Ingest the text directly; no fixture file is written or read back
+        ingest_document(None, test_user_id, content=content)
         
         print("✅ Document ingestion completed!")
         return test_user_id
     except Exception as e:
         print(f"❌ Document ingestion failed: {e}")
-        if 'test_file' in locals() and os.path.exists(test_file):
-            os.unlink(test_file)
         return None
 
 def test_query_pipeline(user_id):
@@ -136,9 +137,11 @@ def test_query_pipeline(user_id):
             "How does supervised learning work?"
         ]
         
-        for i, query in enumerate(test_queries, 1):
+        # One embedding call for all queries; retrieval + LLM run concurrently
+        responses = query_rag_batch(user_id, test_queries)
+        
+        for i, (query, response) in enumerate(zip(test_queries, responses), 1):
             print(f"\n--- Query {i}: {query} ---")
-            response = query_rag(user_id, query)
             print(f"Response: {response[:200]}...")
             
             if "Error:" in response:
@@ -152,41 +155,28 @@ def test_query_pipeline(user_id):
         print(f"❌ Query pipeline failed: {e}")
         return False
 
-def test_cross_tenant_isolation():
+def test_cross_tenant_isolation(user1_content, user2_content):
     """Test that users can't access each other's documents"""
     print("🧪 Testing Cross-Tenant Isolation...")
     try:
-        # Create two users and documents
+        # Create two users
         user1_id = f"user1_{uuid.uuid4().hex[:8]}"
         user2_id = f"user2_{uuid.uuid4().hex[:8]}" 
         
-        # Create user1's document
-        user1_content = "User 1's secret information about quantum computing and advanced algorithms."
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8') as f:
-            f.write(user1_content)
-            user1_file = f.name
-        
-        # Create user2's document  
-        user2_content = "User 2's confidential data about blockchain technology and cryptocurrency."
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8') as f:
-            f.write(user2_content)
-            user2_file = f.name
-        
-        # Ingest both documents
-        print(f"Ingesting document for user1: {user1_id}")
-        ingest_document(user1_file, user1_id)
-        
-        print(f"Ingesting document for user2: {user2_id}")
-        ingest_document(user2_file, user2_id)
-        
-        # Test queries
-        query = "Tell me about quantum computing"
-        
-        print(f"\nUser1 querying about quantum computing...")
-        user1_response = query_rag(user1_id, query)
-        
-        print(f"User2 querying about quantum computing...")
-        user2_response = query_rag(user2_id, query)
+        # Ingest both documents concurrently (embedding + upsert round trips overlap)
+        print(f"Ingesting documents for user1: {user1_id} and user2: {user2_id}")
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            _map_buffered(
+                ex, lambda content, user_id: ingest_document(None, user_id, content=content),
+                [user1_content, user2_content], [user1_id, user2_id],
+            )
+            
+            # Test queries (both users ask the same question concurrently)
+            query = "Tell me about quantum computing"
+            print(f"\nUser1 and User2 querying about quantum computing...")
+            user1_response, user2_response = _map_buffered(
+                ex, query_rag, [user1_id, user2_id], [query, query]
+            )
         
         # User1 should get relevant results, User2 should not
         user1_has_quantum = "quantum" in user1_response.lower()
@@ -195,10 +185,6 @@ def test_cross_tenant_isolation():
         print(f"User1 response contains 'quantum': {user1_has_quantum}")
         print(f"User2 response contains 'quantum': {user2_has_quantum}")
         
-        # Cleanup
-        os.unlink(user1_file)
-        os.unlink(user2_file)
-        
         if user1_has_quantum and not user2_has_quantum:
             print("✅ Cross-tenant isolation working correctly!")
             return True
@@ -210,53 +196,122 @@ def test_cross_tenant_isolation():
         print(f"❌ Cross-tenant isolation test failed: {e}")
         return False
 
+class _ThreadBufferedStdout:
+    """sys.stdout proxy that buffers writes per worker thread so concurrent
+    stages don't interleave their output"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def write(self, text):
+        buf = getattr(self._local, 'buf', None)
+        return (buf or self._stream).write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        # isatty(), encoding, fileno(), ... behave like the real stream
+        return getattr(self._stream, name)
+
+
+def _run_buffered(stdout, func, *args):
+    """Run a test stage with its output captured; returns (result, output)"""
+    stdout._local.buf = io.StringIO()
+    try:
+        return func(*args), stdout._local.buf.getvalue()
+    finally:
+        stdout._local.buf = None
+
+
+def _map_buffered(ex, func, *iterables):
+    """ex.map() for use inside a buffered stage: the pool's threads have no
+    buffer of their own, so each call's output is captured and replayed into
+    the caller's buffer in input order; returns the results as a list"""
+    stdout = sys.stdout
+    if not isinstance(stdout, _ThreadBufferedStdout):
+        return list(ex.map(func, *iterables))
+    results = []
+    for result, output in ex.map(lambda *args: _run_buffered(stdout, func, *args), *iterables):
+        stdout.write(output)
+        results.append(result)
+    return results
+
+
 def main():
     """Run all tests"""
     print("🚀 Starting RAG Flow Comprehensive Test\n")
     print("=" * 60)
     
-    test_results = {}
-    
-    # Test 1: Embedding API
-    test_results['embedding'] = test_embedding_api()
-    print()
-    
-    # Test 2: Pinecone Connection
-    test_results['pinecone'] = test_pinecone_connection()
-    print()
-    
-    # Test 3: Tenant Isolation
-    test_results['tenant'] = test_tenant_isolation()
-    print()
+    # The stages are network-bound (Gemini / Pinecone round trips), so the
+    # independent ones run concurrently and their output is replayed in order
+    stdout = _ThreadBufferedStdout(sys.stdout)
+    sys.stdout = stdout
+    try:
+        with ThreadPoolExecutor(max_workers=5) as ex:
+            futures = {
+                'embedding': ex.submit(_run_buffered, stdout, test_embedding_api),
+                'pinecone': ex.submit(_run_buffered, stdout, test_pinecone_connection),
+                'tenant': ex.submit(_run_buffered, stdout, test_tenant_isolation),
+            }
+            # Ingestion, query and isolation all need the embedding API and
+            # the index, so they only start once both probes have passed
+            # (which also keeps them from racing the Pinecone probe to create
+            # a missing index)
+            services_ok = futures['embedding'].result()[0] and futures['pinecone'].result()[0]
+            if services_ok:
+                futures['ingestion'] = ex.submit(_run_buffered, stdout, test_document_ingestion, ML_DOCUMENT)
+                futures['isolation'] = ex.submit(
+                    _run_buffered, stdout, test_cross_tenant_isolation, USER1_DOCUMENT, USER2_DOCUMENT
+                )
+            stage_results = {name: future.result() for name, future in futures.items()}
+    finally:
+        sys.stdout = stdout._stream
     
-    # Test 4: Document Ingestion
-    test_user_id = test_document_ingestion()
-    test_results['ingestion'] = test_user_id is not None
-    print()
+    test_results = {}
+    for name in ('embedding', 'pinecone', 'tenant'):
+        result, output = stage_results[name]
+        print(output)
+        test_results[name] = result
     
-    # Test 5: Query Pipeline (only if ingestion worked)
-    if test_user_id:
-        test_results['query'] = test_query_pipeline(test_user_id)
+    if not services_ok:
+        # Fail fast: every remaining stage would only burn API calls failing
+        for name in ('ingestion', 'query', 'isolation'):
+            test_results[name] = False
+            print(f"⏭️  Skipping {name} test: embedding API or Pinecone unavailable")
+        print()
     else:
-        test_results['query'] = False
-        print("❌ Skipping query test due to ingestion failure")
-    print()
-    
-    # Test 6: Cross-tenant isolation
-    test_results['isolation'] = test_cross_tenant_isolation()
-    print()
+        test_user_id, output = stage_results['ingestion']
+        print(output)
+        
+        # Test 5: Query Pipeline (only if ingestion worked)
+        test_results['ingestion'] = test_user_id is not None
+        if test_user_id:
+            test_results['query'] = test_query_pipeline(test_user_id)
+        else:
+            test_results['query'] = False
+            print("❌ Skipping query test due to ingestion failure")
+        print()
+        
+        # Test 6: Cross-tenant isolation (ran alongside the other stages)
+        test_results['isolation'], output = stage_results['isolation']
+        print(output)
     
     # Summary
     print("=" * 60)
     print("📊 TEST SUMMARY:")
     print("=" * 60)
     
-    passed_tests = sum(test_results.values())
-    total_tests = len(test_results)
-    
+    # Tally and format in one pass, then write the table with a single print
+    passed_tests = 0
+    lines = []
     for test_name, result in test_results.items():
+        passed_tests += bool(result)
         status = "✅ PASS" if result else "❌ FAIL"
-        print(f"{test_name.upper():.<20} {status}")
+        lines.append(f"{test_name.upper():.<20} {status}")
+    total_tests = len(test_results)
+    print("\n".join(lines))
     
     print("-" * 60)
     print(f"TOTAL: {passed_tests}/{total_tests} tests passed")
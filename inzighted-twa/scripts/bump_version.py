@@ -4,16 +4,23 @@ Usage: python bump_version.py [major|minor|patch]
 
 This script makes a very small, best-effort edit and should be reviewed before committing.
 """
+import os
 import re
 import sys
 from pathlib import Path
 
+# Patterns compiled once at import
+_VC_RE = re.compile(r'versionCode\s+(\d+)')
+_VN_RE = re.compile(r'versionName\s+"([^"]+)"')
+# Matches either field so both are rewritten in a single pass over the file
+_VERSION_SUB_RE = re.compile(r'(versionCode\s+)\d+|(versionName\s+")[^"]+(")')
+
 build_gradle = Path(__file__).resolve().parents[1] / 'app' / 'build.gradle'
 text = build_gradle.read_text(encoding='utf-8')
 
 # Find versionCode and versionName
-vc_match = re.search(r'versionCode\s+(\d+)', text)
-vn_match = re.search(r'versionName\s+"([^"]+)"', text)
+vc_match = _VC_RE.search(text)
+vn_match = _VN_RE.search(text)
 if not vc_match or not vn_match:
     print('versionCode/versionName not found in build.gradle')
     sys.exit(1)
@@ -43,8 +50,20 @@ else:
 new_vn = '.'.join(parts)
 new_vc = vc + 1
 
-text = re.sub(r'(versionCode\s+)\d+', r'\1{}'.format(new_vc), text)
-text = re.sub(r'(versionName\s+")([^"]+)(")', r'\1{}\3'.format(new_vn), text)
 
-build_gradle.write_text(text, encoding='utf-8')
+def _replace_version(m):
+    if m.group(1) is not None:
+        return m.group(1) + str(new_vc)
+    return m.group(2) + new_vn + m.group(3)
+
+
+text, replaced = _VERSION_SUB_RE.subn(_replace_version, text, count=2)
+if replaced != 2:
+    print(f'Expected to rewrite versionCode and versionName, rewrote {replaced} field(s); build.gradle left unchanged')
+    sys.exit(1)
+
+# Write to a sibling temp file and swap it in so build.gradle is never half-written
+tmp_path = build_gradle.with_name(build_gradle.name + '.tmp')
+tmp_path.write_text(text, encoding='utf-8')
+os.replace(tmp_path, build_gradle)
 print(f'Bumped versionCode {vc} -> {new_vc}, versionName {vn} -> {new_vn}')
@@ -4,24 +4,33 @@ Test script for Tanglish Agent Implementation
 Run this after migrations to verify the implementation
 """
 
+import io
 import os
 import sys
-import django
+from concurrent.futures import ThreadPoolExecutor
 
-# Setup Django environment
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hellotutor.settings')
-django.setup()
 
-from api.models import User, Document, ChatSession, QuestionItem, EvaluatorResult
-from api.gemini_client import gemini_client
-from api.tanglish_prompts import fallback_intent_classifier
+_DJ_READY = False
+
+
+def ensure_django():
+    """Set up Django on first use; checks that don't need it skip the cost"""
+    global _DJ_READY
+    if not _DJ_READY:
+        import django
+        django.setup()
+        _DJ_READY = True
 
 
 def test_intent_classifier_fallback():
     """Test the fallback intent classifier with sample messages"""
     print("\n=== Testing Intent Classifier Fallback ===")
     
+    # Pure-Python classifier: no Django setup needed
+    from api.tanglish_prompts import fallback_intent_classifier
+    
     test_cases = [
         ("Resonance la current and voltage in phase irukkum.", "DIRECT_ANSWER"),
         ("I think it's 5V, but why does it change?", "MIXED"),
@@ -36,54 +45,70 @@ def test_intent_classifier_fallback():
         print(f"{status} '{message[:50]}...' -> {result} (expected: {expected})")
 
 
-def test_gemini_methods():
-    """Test Gemini client new methods"""
-    print("\n=== Testing Gemini Client Methods ===")
-    
-    # Test classify_intent
-    print("\n1. Testing classify_intent()...")
+def _probe_classify_intent(gemini_client, out):
+    out.write("\n1. Testing classify_intent()...\n")
     test_message = "The current is in phase with voltage at resonance."
     test_question = "What happens to the phase relationship at resonance?"
     try:
         result = gemini_client.classify_intent(test_message, current_question=test_question)
-        print(f"   ✅ Intent classification result: {result}")
+        out.write(f"   ✅ Intent classification result: {result}\n")
         if result.get("valid"):
-            print(f"      Token: {result.get('token')}")
+            out.write(f"      Token: {result.get('token')}\n")
         else:
-            print(f"      Invalid message: {result.get('message')}")
+            out.write(f"      Invalid message: {result.get('message')}\n")
     except Exception as e:
-        print(f"   ❌ Error: {e}")
-    
-    # Test generate_questions_structured
-    print("\n2. Testing generate_questions_structured()...")
+        out.write(f"   ❌ Error: {e}\n")
+
+
+def _probe_generate_questions(gemini_client, out):
+    out.write("\n2. Testing generate_questions_structured()...\n")
     test_context = "Resonance in RLC circuits occurs when inductive and capacitive reactances are equal."
     try:
         questions = gemini_client.generate_questions_structured(test_context, total_questions=3)
         if questions:
-            print(f"   ✅ Generated {len(questions)} questions")
+            out.write(f"   ✅ Generated {len(questions)} questions\n")
             for q in questions[:2]:
-                print(f"      - {q.get('archetype')}: {q.get('question_text', '')[:60]}...")
+                out.write(f"      - {q.get('archetype')}: {q.get('question_text', '')[:60]}...\n")
         else:
-            print(f"   ⚠️  No questions generated")
+            out.write(f"   ⚠️  No questions generated\n")
     except Exception as e:
-        print(f"   ❌ Error: {e}")
-    
-    # Test evaluate_answer
-    print("\n3. Testing evaluate_answer()...")
+        out.write(f"   ❌ Error: {e}\n")
+
+
+def _probe_evaluate_answer(gemini_client, out):
+    out.write("\n3. Testing evaluate_answer()...\n")
     context = "Question about resonance"
     expected = "Current and voltage are in phase at resonance"
     student = "At resonance, current and voltage have same phase"
     try:
         evaluation = gemini_client.evaluate_answer(context, expected, student)
-        print(f"   ✅ Evaluation: score={evaluation.get('score')}, XP={evaluation.get('XP')}")
-        print(f"      Explanation: {evaluation.get('explanation', '')[:60]}...")
+        out.write(f"   ✅ Evaluation: score={evaluation.get('score')}, XP={evaluation.get('XP')}\n")
+        out.write(f"      Explanation: {evaluation.get('explanation', '')[:60]}...\n")
     except Exception as e:
-        print(f"   ❌ Error: {e}")
+        out.write(f"   ❌ Error: {e}\n")
+
+
+def test_gemini_methods():
+    """Test Gemini client new methods"""
+    print("\n=== Testing Gemini Client Methods ===")
+    ensure_django()
+    from api.gemini_client import gemini_client
+    
+    # The three probes are independent network calls: run them concurrently,
+    # each writing to its own buffer, then print the buffers in order
+    probes = [_probe_classify_intent, _probe_generate_questions, _probe_evaluate_answer]
+    buffers = [io.StringIO() for _ in probes]
+    with ThreadPoolExecutor(max_workers=len(probes)) as ex:
+        for future in [ex.submit(probe, gemini_client, buf) for probe, buf in zip(probes, buffers)]:
+            future.result()
+    for buf in buffers:
+        print(buf.getvalue(), end='')
 
 
 def test_models():
     """Test that new models are available"""
     print("\n=== Testing Database Models ===")
+    ensure_django()
     
     try:
         # Check QuestionItem model
@@ -117,8 +142,14 @@ def test_models():
 def test_urls():
     """Test that new URL endpoints are registered"""
     print("\n=== Testing URL Configuration ===")
+    ensure_django()
+    
+    from django.urls import get_resolver, get_script_prefix
     
-    from django.urls import reverse
+    # Walk urlpatterns once and reuse the resolver for every endpoint; the
+    # api routes are included without a namespace, so names are reversed as-is
+    resolver = get_resolver()
+    prefix = get_script_prefix()
     
     endpoints = [
         'agent_session_start',
@@ -131,9 +162,9 @@ def test_urls():
         try:
             if endpoint in ['agent_respond', 'agent_status', 'agent_language_toggle']:
                 # These need a session_id parameter
-                url = reverse(f'api:{endpoint}', kwargs={'session_id': '00000000-0000-0000-0000-000000000000'})
+                url = prefix + resolver.reverse(endpoint, session_id='00000000-0000-0000-0000-000000000000')
             else:
-                url = reverse(f'api:{endpoint}')
+                url = prefix + resolver.reverse(endpoint)
             print(f"✅ {endpoint}: {url}")
         except Exception as e:
             print(f"❌ {endpoint}: {e}")
@@ -146,6 +177,8 @@ def main():
     print("=" * 70)
     
     # Check if Gemini is available
+    ensure_django()
+    from api.gemini_client import gemini_client
     if gemini_client.is_available():
         print("\n✅ Gemini client initialized successfully")
     else: